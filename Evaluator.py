@@ -0,0 +1,337 @@
+# This file runs agents on the pogo and scores them. An episode lasts 10 seconds of simulated time, or until the pogo falls over. Time is
+# read from the simulated clock of the pogo rather than the wall clock, so an episode gives the same result whether it is drawn at 60 frames
+# per second or run headless as fast as the CPU allows. Because of this, a whole population can also be evaluated on a pool of worker
+# processes, or all at the same time on a MultiPogo, and give exactly the same results as running the agents one after another.
+#
+# A single episode is a noisy measure of an agent, so run_episodes can evaluate agents over several episodes, each starting with a different
+# small push, and average them. Agents can also be raced between episodes, stopping the ones that are clearly not going to make the top
+# 20%, so that most of the episodes are spent on the agents that might reproduce.
+#
+# Jacob Karty 12/3/2024
+
+from Pogo import Pogo
+from NeuralNet import Population, SharedPopulation
+from Observer import Observer
+from Trainer import episode_rng
+from Metrics import Metrics
+import time
+import numpy as np
+
+episode_length = 10 # seconds an agent gets before it is evaluated
+fall_grace_time = 0.5 # seconds a fallen over pogo is allowed to slide before the episode ends
+fall_angle = 1.4 # angle (in radians) past which the pogo counts as fallen over
+max_speed = 1000 # the pogo is assumed never to move faster than this to the right (pixels per second), for giving up episodes that
+                 # cannot reach a fitness. No pogo has been seen moving faster than about 390, even over a single step
+
+"""Returns the settings an episode on the given pogo depends on, for keying a FitnessCache. seed is the seed of the episodes if they
+are random, None as they are not, and episodes and push_speed are the arguments of run_episodes. A MultiPogo counts as a Pogo, as its pogos
+move exactly like one. observation is the settings of the Observer the agents see the pogo through (see get_config), the raw state if it
+is not given. The steps every action is held for (action_repeat of the pogo) are part of the settings as well"""
+def environment_config(pogo, seed=None, episodes=1, push_speed=0, observation=None):
+    return {'episode_length': episode_length, 'fall_grace_time': fall_grace_time, 'fall_angle': fall_angle,
+            'physics': 'Pogo' if isinstance(pogo, Pogo) else type(pogo).__name__, 'time_step': pogo.time_step, 'seed': seed,
+            'episodes': episodes, 'push_speed': push_speed, 'observation': observation or Observer().get_config(),
+            'action_repeat': pogo.action_repeat}
+
+"""The highest fitness an episode that is sim_time seconds in, with the pogo distance pixels to the right, can still end with"""
+def best_fitness(distance, sim_time, time_step):
+    return distance + sim_time * 10 + (episode_length + time_step - sim_time) * (10 + max_speed)
+
+"""Helper function for run_episode and run_generation that steps the pogo forward while the actions are held, which is action_repeat steps
+(see Pogo). Before every step the episode is checked for being over by running, which returns the number of pogos still running, 0 once
+every episode is over. The state of the pogo is read into state before every step but the first, so the episode ends on the same step
+whatever the action_repeat. If a renderer is given, every step is drawn with the given spaces, so the window shows the pogo moving at the
+same speed whatever the action_repeat. The steps and the time of every phase are added to metrics, if it is given (None times nothing).
+Returns False if the episode is over or the window was closed"""
+def hold_actions(pogo, renderer, spaces, metrics, state, running):
+    for i in range(pogo.action_repeat):
+        if i > 0: # the state of the first step was read for the agent to decide on
+            pogo.get_current_state(state)
+            if metrics is not None:
+                metrics.lap('state')
+        pogos = running()
+        if not pogos:
+            return False
+        if metrics is not None:
+            metrics.steps += pogos
+        pogo.step()
+        if metrics is not None:
+            metrics.lap('physics')
+        if renderer is not None and not renderer.draw(*spaces, metrics=metrics):
+            return False
+    return True
+
+"""Runs a single agent on the pogo until it falls over or runs out of time, then resets the pogo. If a renderer is given, every step is
+drawn and the episode stops early when the window is closed. Returns the distance reached and the fitness of the agent, which is the
+distance plus how long it stayed up times 10, encouraging the agent to both stay up and move further. The pogo starts with the velocity
+push, and the episode is given up early once its fitness can no longer reach give_up. The time of every phase of the episode is added to
+metrics, if it is given, and nothing is timed if it is not. The agent sees the pogo through observer (see Observer.py), the raw state if it
+is not given. The agent decides every action_repeat steps of the pogo, and the episode is checked for being over before every step."""
+def run_episode(pogo, agent, renderer=None, push=(0, 0), give_up=-np.inf, metrics=None, observer=None):
+    observer = observer or Observer()
+    observer.reset()
+    current_state = observer.state
+    if metrics is not None:
+        metrics.mark()
+    upright_time = 0
+    pogo.push(push)
+
+    # returns 1 while the episode is running and 0 once it is over, see hold_actions
+    def running():
+        nonlocal upright_time
+        if abs(current_state[0]) < fall_angle: # if it falls over, wait a little bit to let it slide
+            upright_time = pogo.sim_time
+        if pogo.sim_time > episode_length or pogo.sim_time - upright_time > fall_grace_time:
+            return 0
+        return int(best_fitness(current_state[2] - 300, pogo.sim_time, pogo.time_step) >= give_up)
+
+    while True:
+        #get current state, determine agents response, and apply those responses to the environment
+        observation = observer.read(pogo)
+        if metrics is not None:
+            metrics.lap('state')
+        agent_response = agent.calculate_forward(observation)
+        if metrics is not None:
+            metrics.lap('forward')
+        pogo.apply_actions(agent_response)
+        if metrics is not None:
+            metrics.lap('actions')
+
+        # Step the simulation forward until the next decision or the end of the episode
+        if not hold_actions(pogo, renderer, (pogo.space,), metrics, current_state, running):
+            break
+
+    distance = current_state[2] - 300
+    fitness = distance + pogo.sim_time * 10
+    if metrics is not None:
+        metrics.mark()
+    pogo.reset_simulation()
+    if metrics is not None:
+        metrics.lap('reset')
+    return distance, fitness
+
+"""Runs every agent of the population at the same time on a MultiPogo that has a pogo for each agent. The responses of all the agents are
+calculated at once as a Population, and the pogo of an agent is removed from the simulation as soon as its episode is over. If a renderer is
+given, the whole generation is drawn at once and the generation stops early when the window is closed. Returns a list of (distance, fitness)
+in the same order as the population, identical to calling run_episode on each agent one after another. The population can be smaller than
+the number of pogos, in which case the pogos without an agent are removed right away. pushes and give_up are a push and a give_up (see
+run_episode) for each agent, and the time of every phase is added to metrics, if it is given. observer is an Observer with a row for every
+pogo, the raw state if it is not given"""
+def run_generation(pogo, population, renderer=None, pushes=None, give_up=None, metrics=None, observer=None):
+    observer = observer or Observer(len(pogo.active))
+    observer.reset()
+    current_state = observer.state
+    networks = Population(population)
+    results = [None] * len(population)
+    upright_time = np.zeros(len(pogo.active))
+    agent_response = np.zeros((len(pogo.active), 5))
+    agent_give_up = np.full(len(pogo.active), -np.inf)
+    if give_up is not None:
+        agent_give_up[:len(population)] = give_up
+    for i in range(len(population), len(pogo.active)):
+        pogo.remove_agent(i)
+    if pushes is not None:
+        agent_pushes = np.zeros((len(pogo.active), 2))
+        agent_pushes[:len(population)] = pushes
+        pogo.push(agent_pushes)
+
+    # ends the episodes that are over and returns the number of pogos still running, see hold_actions
+    def running():
+        upright_time[np.abs(current_state[:, 0]) < fall_angle] = pogo.sim_time # if it falls over, wait a little bit to let it slide
+        done = pogo.active & ((pogo.sim_time > episode_length) | (pogo.sim_time - upright_time > fall_grace_time) |
+                              (best_fitness(current_state[:, 2] - 300, pogo.sim_time, pogo.time_step) < agent_give_up))
+        for i in np.flatnonzero(done):
+            distance = float(current_state[i, 2]) - 300
+            results[i] = (distance, distance + pogo.sim_time * 10)
+            pogo.remove_agent(i)
+        return int(np.count_nonzero(pogo.active))
+
+    if metrics is not None:
+        metrics.mark()
+    while True:
+        #get the current state of every pogo, determine all the agents responses at once, and apply those responses
+        observation = observer.read(pogo)
+        if metrics is not None:
+            metrics.lap('state')
+        agent_response[:len(population)] = networks.calculate_forward(observation[:len(population)])
+        if metrics is not None:
+            metrics.lap('forward')
+        pogo.apply_actions(agent_response)
+        if metrics is not None:
+            metrics.lap('actions')
+
+        # Step the simulation forward until the next decision or the end of every episode
+        if not hold_actions(pogo, renderer, pogo.spaces if renderer is not None else (), metrics, current_state, running):
+            break
+
+    if metrics is not None:
+        metrics.mark()
+    pogo.reset_simulation()
+    if metrics is not None:
+        metrics.lap('reset')
+    return results
+
+"""Returns the push each episode of run_episodes starts with, as an (episodes, 2) array. The first episode has no push, and every other
+episode gets a random velocity of up to push_speed pixels per second in x and in y. Every agent gets the same pushes, so that they are
+compared fairly"""
+def episode_pushes(seed, episodes, push_speed):
+    pushes = episode_rng(seed).uniform(-push_speed, push_speed, (episodes, 2))
+    pushes[0] = 0
+    return pushes
+
+"""Evaluates agents over one episode for every push in pushes (see episode_pushes), and averages their distances and fitnesses. The
+episodes are run in rounds: evaluate is called once per round with a list of agents, a push for each and a give_up for each (see
+run_episode, no episode is given up), and returns a list of (distance, fitness) like run_generation, or None if it was stopped early,
+in which case None is returned.
+
+If num_top is more than 0, the agents are raced for the num_top best averages. From the second round on, the average fitness of every
+agent still running gets a confidence interval of confidence standard errors to either side, using the larger of its own variance and the
+mean variance of the agents still running. An agent is stopped once the top of its interval is below the bottoms of the intervals of
+num_top other agents, or below cutoff, a fitness the top agents are known to reach such as that of the last of the top 20% kept from the
+last generation. The intervals narrow with every episode, so agents that are clearly out of the running are stopped after a few episodes.
+A stopped agent gets the average distance of the episodes it ran, and the average fitness capped just below the cutoff and below every
+agent that ran all the episodes, so that it ranks below them. Returns a list of (distance, fitness, complete) in the same order as
+agents, where complete is False for an agent that was stopped"""
+def run_episodes(evaluate, agents, pushes, num_top=0, cutoff=-np.inf, confidence=2):
+    episodes = len(pushes)
+    distances = np.zeros(len(agents)) # the sums over the episodes run so far
+    fitnesses = np.zeros(len(agents))
+    squares = np.zeros(len(agents)) # the sums of the squared fitnesses, for the variances
+    runs = np.zeros(len(agents))
+    remaining = np.arange(len(agents))
+    for episode in range(episodes):
+        if len(remaining) == 0:
+            break
+        results = evaluate([agents[i] for i in remaining], np.tile(pushes[episode], (len(remaining), 1)), np.full(len(remaining), -np.inf))
+        if results is None:
+            return None
+        distance, fitness = np.array(results, dtype=float).reshape(-1, 2).T
+        distances[remaining] += distance
+        fitnesses[remaining] += fitness
+        squares[remaining] += fitness ** 2
+        runs[remaining] += 1
+
+        # stop the agents whose interval is below those of num_top others, or below the cutoff
+        n = episode + 1
+        if num_top > 0 and n >= 2 and n < episodes:
+            means = fitnesses[remaining] / n
+            variances = np.maximum(squares[remaining] / n - means ** 2, 0) * n / (n - 1)
+            margins = confidence * np.sqrt(np.maximum(variances, np.mean(variances)) / n)
+            bar = cutoff
+            if len(remaining) > num_top:
+                bar = max(bar, np.partition(means - margins, -num_top)[-num_top])
+            remaining = remaining[means + margins >= bar]
+    complete = np.zeros(len(agents), dtype=bool)
+    complete[remaining] = True
+    distances /= runs
+    fitnesses /= runs
+    if not np.all(complete):
+        floors = fitnesses[complete].tolist() + ([cutoff] if cutoff > -np.inf else []) # at least num_top agents ran every episode without one
+        fitnesses[~complete] = np.minimum(fitnesses[~complete], np.nextafter(min(floors), -np.inf))
+    return list(zip(distances.tolist(), fitnesses.tolist(), complete.tolist()))
+
+# the pogo, observer and metrics owned by each worker process of a ParallelEvaluator, and the SharedPopulation it is attached to
+worker_pogo = None
+worker_observer = None
+worker_metrics = None
+worker_population = None
+
+"""Creates the pogo and the observer (from its settings, see get_config of Observer) of a worker process when the pool starts.
+action_repeat is the steps every action is held for on the pogo (see Pogo)"""
+def init_worker(observation=None, action_repeat=1):
+    global worker_pogo, worker_observer, worker_metrics
+    worker_pogo = Pogo(action_repeat=action_repeat)
+    worker_observer = Observer(**(observation or {}))
+    worker_metrics = Metrics()
+
+"""Runs a single agent on the pogo of the worker process. Takes the agent, its push and its give_up (see run_episode)"""
+def evaluate_agent(job):
+    agent, push, give_up = job
+    return run_episode(worker_pogo, agent, None, push, give_up, observer=worker_observer)
+
+"""Runs the agent at index of a SharedPopulation on the pogo of the worker process, and writes its distance and fitness into the shared
+population. Takes the handle of the shared population, the index, the push and give_up of the agent (see run_episode), and whether to
+time the episode, in which case its steps and the time of every phase of Metrics are written into the stats of the agent. The worker
+attaches to the shared population the first time it sees it, and keeps it for every later agent"""
+def evaluate_shared_agent(job):
+    global worker_population
+    handle, index, push, give_up, timed = job
+    if worker_population is None or worker_population.name != handle[2]:
+        if worker_population is not None:
+            worker_population.close()
+        worker_population = SharedPopulation(*handle)
+    metrics = None
+    if timed:
+        metrics = worker_metrics
+        metrics.start_generation()
+    distance, fitness = run_episode(worker_pogo, worker_population.agents[index], None, push, give_up, metrics, worker_observer)
+    worker_population.distances[index] = distance
+    worker_population.fitnesses[index] = fitness
+    if timed:
+        worker_population.stats[index] = [metrics.steps] + [metrics.times[phase] for phase in Metrics.phases]
+
+"""Runs a single agent like evaluate_agent. Returns its result and the CPU seconds the worker spent on it"""
+def time_agent(job):
+    start = time.process_time()
+    result = evaluate_agent(job)
+    return result, time.process_time() - start
+
+class ParallelEvaluator:
+    """Starts a pool of worker processes that each own a pogo. workers is the number of processes, None uses every core. observation is
+    the settings of the Observer the agents see the pogo through (see get_config of Observer), and action_repeat the steps the pogos of the
+    workers hold every action for (see Pogo). Episodes are deterministic, so the workers need no random number generator"""
+    def __init__(self, workers=None, observation=None, action_repeat=1):
+        import multiprocessing # imported here, as only training with workers needs it
+        from multiprocessing import resource_tracker
+        self.workers = workers or multiprocessing.cpu_count()
+        # the workers have to share the resource tracker of this process, otherwise a forked worker starts its own when it attaches to the
+        # SharedPopulation, and that one removes the block when the worker exits
+        resource_tracker.ensure_running()
+        self.pool = multiprocessing.Pool(self.workers, initializer=init_worker, initargs=(observation, action_repeat))
+        self.population = None # the SharedPopulation the agents are handed to the workers through, made when it is first needed
+
+    """Runs every agent of the population headless on the workers. Returns a list of (distance, fitness) in the same order as the
+    population, identical to calling run_episode on each agent one after another. pushes and give_up are a push and a give_up (see
+    run_episode) for each agent. The genomes are copied into shared memory and the workers write the results back into it, so only the
+    index, push and give_up of each agent are sent to the workers. If metrics is given, the workers time their episodes and the steps are
+    added to it. The time spent waiting for the workers is added to the phases in the shares the workers spent on each, so the phases still
+    add up to the wall time"""
+    def evaluate(self, population, pushes=None, give_up=None, metrics=None):
+        if len(population) == 0:
+            return []
+        if pushes is None:
+            pushes = np.zeros((len(population), 2))
+        if give_up is None:
+            give_up = np.full(len(population), -np.inf)
+        if self.population is None or self.population.capacity < len(population) or self.population.layers != list(population[0].inputs):
+            if self.population is not None:
+                self.population.close(unlink=True)
+            self.population = SharedPopulation(population[0].inputs, len(population), stats=1 + len(Metrics.phases))
+        self.population.write(population)
+        handle = self.population.handle()
+        jobs = [(handle, i, tuple(push), agent_give_up, metrics is not None) for i, (push, agent_give_up) in enumerate(zip(pushes, give_up))]
+        chunksize = max(1, len(population) // (self.workers * 4)) # a few chunks per worker so that long episodes even out
+        start = time.perf_counter()
+        self.pool.map(evaluate_shared_agent, jobs, chunksize)
+        if metrics is not None:
+            waited = time.perf_counter() - start
+            stats = np.sum(self.population.stats[:len(population)], axis=0)
+            metrics.steps += int(stats[0])
+            for phase, phase_time in zip(Metrics.phases, stats[1:]):
+                metrics.times[phase] += waited * phase_time / max(np.sum(stats[1:]), 1e-12)
+            metrics.mark()
+        return list(zip(self.population.distances[:len(population)].tolist(), self.population.fitnesses[:len(population)].tolist()))
+
+    """Starts running a single agent on the next free worker, and returns right away. Once the agent is done, callback is called on a
+    thread of the pool with its result and the CPU seconds the worker spent on it (see time_agent), or error_callback with the exception if
+    it failed. push and give_up are as in run_episode"""
+    def submit(self, agent, callback, error_callback=None, push=(0, 0), give_up=-np.inf):
+        self.pool.apply_async(time_agent, ((agent, push, give_up),), callback=callback, error_callback=error_callback)
+
+    """Stops the worker processes, and removes the shared memory"""
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+        if self.population is not None:
+            self.population.close(unlink=True)
+            self.population = None
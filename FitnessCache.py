@@ -0,0 +1,90 @@
+# This file keeps the results of evaluating agents, so that an agent is not simulated again when the exact same agent comes up again. This
+# happens every generation with elitism, as the top 20% of agents are kept unchanged, and often when a checkpoint is mutated with a low
+# mutation rate. Results are keyed by a hash of the weights and biases of the agent together with the settings of the episode (its length,
+# when the pogo counts as fallen over, the physics and the seed of the episode), so that a result is never reused for a different episode.
+# The cache holds a limited number of agents, dropping the one that was used the longest ago, and can be kept in a file across runs.
+#
+# Jacob Karty 12/5/2024
+
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import numpy as np
+
+class FitnessCache:
+    """config is a dictionary of the settings of the episode (see environment_config in Evaluator.py). max_size is the number of agents
+    the cache holds, 0 turns the cache off. Episodes are deterministic, so an agent is only ever evaluated once: evaluating it again with
+    the same settings gives the same result. If path is given, the cache is loaded from that file, and save writes it back"""
+    def __init__(self, config, max_size=10000, path=None):
+        self.config = json.dumps(config, sort_keys=True)
+        self.max_size = max_size
+        self.path = path
+        self.results = OrderedDict() # key -> (distance, fitness), the most recently used last
+        self.hits = 0
+        self.misses = 0
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    """Returns the key of an agent, a hash of its layers, its weights and biases, and the settings of the episode"""
+    def key(self, agent):
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(self.config.encode())
+        digest.update(json.dumps(list(agent.inputs)).encode())
+        digest.update(np.ascontiguousarray(agent.genome, dtype='<f8').tobytes())
+        return digest.hexdigest()
+
+    """Returns a (distance, fitness) for every agent, in the same order as agents. Agents that are in the cache get their stored result.
+    All the other agents are evaluated at once by calling evaluate with a list of agents (copies of the same agent are only in it once),
+    which returns a list of (distance, fitness) in the same order, or None if the evaluation was stopped early, in which case nothing is
+    stored and None is returned. A result can also be (distance, fitness, complete) like those of run_episodes, and a result that is not
+    complete, such as the fitness of an agent stopped early, is returned but not stored, as it is not the real fitness of the agent"""
+    def evaluate(self, agents, evaluate):
+        keys = [self.key(agent) for agent in agents]
+        pending = []
+        first = {}
+        for i, key in enumerate(keys):
+            if key in self.results or key in first:
+                self.hits += 1
+            else:
+                self.misses += 1
+                first[key] = i
+                pending.append(i)
+
+        results = evaluate([agents[i] for i in pending]) if pending else []
+        if results is None:
+            return None
+        partial = {}
+        for i, result in zip(pending, results):
+            if len(result) > 2 and not result[2]:
+                partial[keys[i]] = tuple(result[:2])
+            else:
+                self.results[keys[i]] = tuple(result[:2])
+
+        out = []
+        for key in keys:
+            if key in partial:
+                out.append(partial[key])
+            else:
+                self.results.move_to_end(key)
+                out.append(self.results[key])
+        while len(self.results) > self.max_size: # drop the agents used the longest ago
+            self.results.popitem(last=False)
+        return out
+
+    """Writes the cache to path (the path it was loaded from if not given), so that a later run can reuse it"""
+    def save(self, path=None):
+        path = path or self.path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'w') as file:
+            json.dump(list(self.results.items()), file)
+        os.replace(path + '.tmp', path)
+
+    """Adds the results stored in path to the cache"""
+    def load(self, path):
+        with open(path) as file:
+            for key, result in json.load(file):
+                self.results[key] = tuple(result)
+        while len(self.results) > self.max_size:
+            self.results.popitem(last=False)
@@ -0,0 +1,147 @@
+# This file measures where the time of training goes. The training loop is split into phases (getting the state of the pogo, calculating the
+# neural network forward, applying the actions, stepping the physics, polling the window events, drawing, waiting for the frame cap,
+# resetting the pogo, making the next generation, saving the run and exchanging agents with other islands), and the time of each is added up
+# over a generation. After every generation a record with the phase times, the generation wall time, the steps and episodes per second and
+# the fitnesses is appended to a jsonl or csv file in the run directory, so a run can be graphed or compared while or after it trains, and
+# the distance and fitness of every agent are appended to a second jsonl file. Both files are only ever appended to, so another process (see
+# dashboard.py) can follow them with MetricsTail while the run trains. A single generation can also be run under cProfile to see which
+# functions the time goes to. When the episodes run on worker processes, the workers time them and the time spent waiting for the workers is
+# split between the phases in the same shares (see ParallelEvaluator.evaluate).
+#
+# Jacob Karty 12/7/2024
+
+import csv
+import json
+import os
+import time
+
+class Metrics:
+    phases = ('state', 'forward', 'actions', 'physics', 'events', 'render', 'frame_wait', 'reset', 'reproduction', 'save', 'migration')
+
+    """path is the file the record of every generation is appended to, as json lines, or as csv if it ends in .csv, and agents_path the
+    json lines file the results of every agent are appended to. None keeps nothing"""
+    def __init__(self, path=None, agents_path=None):
+        self.path = path
+        self.agents_path = agents_path
+        self.profiler = None
+        self.start_generation()
+
+    """Starts timing a new generation from now, with every phase at 0"""
+    def start_generation(self):
+        self.times = dict.fromkeys(self.phases, 0.0)
+        self.steps = 0 # the number of times a pogo was stepped, counting every pogo of a MultiPogo
+        self.generation_start = self.last = time.perf_counter()
+
+    """Starts timing the next phase from now, without adding the time since the last lap to any phase"""
+    def mark(self):
+        self.last = time.perf_counter()
+
+    """Adds the time since the last lap (or mark) to phase. Calling lap after every phase of a loop times all of them with a single clock
+    read each"""
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.times[phase] += now - self.last
+        self.last = now
+
+    """Ends the generation. Returns its record, and appends it to the file: the generation, its wall time, the time of every phase, the
+    time that was not in any phase, the steps and episodes and their rates, and the given values (such as the mean fitness). Timing then
+    starts again for the next generation"""
+    def record(self, generation, episodes, **values):
+        wall_time = time.perf_counter() - self.generation_start
+        record = {'generation': generation, 'wall_time': wall_time}
+        for phase in self.phases:
+            record[f'{phase}_time'] = self.times[phase]
+        record['other_time'] = wall_time - sum(self.times.values())
+        record['steps'] = self.steps
+        record['episodes'] = episodes
+        record['steps_per_second'] = self.steps / wall_time
+        record['episodes_per_second'] = episodes / wall_time
+        record.update(values)
+
+        if self.path is not None:
+            new_file = not os.path.exists(self.path)
+            with open(self.path, 'a', newline='') as file:
+                if self.path.endswith('.csv'):
+                    writer = csv.DictWriter(file, fieldnames=list(record))
+                    if new_file:
+                        writer.writeheader()
+                    writer.writerow(record)
+                else:
+                    file.write(json.dumps(record) + '\n')
+        self.start_generation()
+        return record
+
+    """Appends a line with the distance and fitness of every agent of a generation, in the order of the population, to agents_path"""
+    def record_agents(self, generation, distances, fitnesses):
+        if self.agents_path is not None:
+            with open(self.agents_path, 'a') as file:
+                file.write(json.dumps({'generation': generation, 'distances': [float(distance) for distance in distances],
+                                       'fitnesses': [float(fitness) for fitness in fitnesses]}) + '\n')
+
+    """Starts running everything under cProfile until stop_profile is called"""
+    def start_profile(self):
+        import cProfile
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+
+    """Stops cProfile, saves its stats to path (they can be opened with pstats or snakeviz), and returns the lines functions that took the
+    most time in total as text"""
+    def stop_profile(self, path, lines=20):
+        import io
+        import pstats
+        self.profiler.disable()
+        self.profiler.dump_stats(path)
+        text = io.StringIO()
+        pstats.Stats(self.profiler, stream=text).sort_stats('cumulative').print_stats(lines)
+        self.profiler = None
+        return text.getvalue()
+
+"""Returns a line of text with the wall time of a record and the share of it each phase took, leaving out the phases that took no time"""
+def summary(record):
+    phases = [f"{phase} {record[f'{phase}_time'] / record['wall_time']:.0%}" for phase in Metrics.phases + ('other',)
+              if record[f'{phase}_time'] > 0]
+    return f"{record['wall_time']:.2f}s, {record['steps_per_second']:.0f} steps/s: " + ', '.join(phases)
+
+"""Graphs the mean fitness of every generation in a file written by Metrics, and saves the graph to image_path"""
+def save_fitness_plot(path, image_path):
+    import matplotlib
+    matplotlib.use('Agg') # draw to the file without opening a window
+    import matplotlib.pyplot as plt
+    records = load_metrics(path)
+    plt.figure()
+    plt.plot([record['generation'] for record in records], [record['mean_fitness'] for record in records], marker='o', linestyle='-', color='b')
+    plt.title('Pogostick Evolution')
+    plt.xlabel('Generation')
+    plt.ylabel('Average Fitness')
+    plt.grid(True)
+    plt.savefig(image_path)
+    plt.close()
+
+
+class MetricsTail:
+    """Follows a file written by Metrics while the run is still appending to it. Every call of read returns the records appended since
+    the last call. A line that is only partly written is left for the next call, and a file that does not exist yet has no records"""
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0 # the bytes of the file that have been read
+        self.header = None # the columns of a csv file
+
+    """Returns the new records as a list of dictionaries"""
+    def read(self):
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, 'rb') as file:
+            file.seek(self.offset)
+            data = file.read()
+        end = data.rfind(b'\n') + 1 # only whole lines
+        self.offset += end
+        lines = data[:end].decode().splitlines()
+        if self.path.endswith('.csv'):
+            if self.header is None and lines:
+                self.header = next(csv.reader([lines.pop(0)]))
+            return [{key: float(value) if value else None for key, value in zip(self.header, row)} for row in csv.reader(lines)]
+        return [json.loads(line) for line in lines if line.strip()]
+
+"""Reads the records of every generation from a file written by Metrics, as a list of dictionaries"""
+def load_metrics(path):
+    return MetricsTail(path).read()
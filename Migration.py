@@ -0,0 +1,44 @@
+# This file moves agents between the islands of an island run (see islands.py). Every island is a population of its own, trained by its
+# own process, possibly on another machine. Every few generations each island sends copies of its best agents to the next island in a ring
+# and takes in the agents the island before it sent. The agents go through a directory every island can reach, a local folder when the
+# islands are processes on one machine, or a shared network folder when they are on several, so nothing but files is needed between them.
+#
+# Jacob Karty 12/9/2024
+
+from NeuralNet import save_population, load_population
+import os
+import time
+
+class DirectoryMigration:
+    """directory is the folder the agents go through, island is the index of this island and islands the number of islands. receive waits
+    up to timeout seconds for the agents of the island before, so a slow or stopped island holds the others up for at most that long"""
+    def __init__(self, directory, island, islands, timeout=600):
+        self.directory = directory
+        self.island = island
+        self.islands = islands
+        self.timeout = timeout
+        os.makedirs(directory, exist_ok=True)
+
+    """The file the agents the given island sends after the given generation are written to"""
+    def path(self, generation, island):
+        return os.path.join(self.directory, f'generation_{generation}_island_{island}.pogo')
+
+    """Writes the agents this island sends after generation. The file is written under another name first, so the island reading it never
+    sees half of it"""
+    def send(self, generation, agents):
+        path = self.path(generation, self.island)
+        save_population(path + '.tmp', agents, generation=generation, island=self.island)
+        os.replace(path + '.tmp', path)
+
+    """Returns the agents the island before this one sent after generation, waiting for them if they are not there yet. Returns an empty
+    list if they do not come within the timeout. The file is removed once it is read, as no other island reads it"""
+    def receive(self, generation):
+        path = self.path(generation, (self.island - 1) % self.islands)
+        start = time.perf_counter()
+        while not os.path.exists(path):
+            if time.perf_counter() - start > self.timeout:
+                return []
+            time.sleep(0.05)
+        agents, metadata = load_population(path, copy=True)
+        os.remove(path)
+        return agents
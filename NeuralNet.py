@@ -1,20 +1,37 @@
 # This is a neural net class. This takes inputs of the size of the neural net and generates random weights and biases. These neural nets can
-# make children by randomly selecting between weights and biases of two parents. The resulting child is then randomly mutated slightly
+# make children by randomly selecting between weights and biases of two parents. The resulting child is then randomly mutated slightly.
+# All the weights and biases of a neural net live in a single flat array, its genome, and the weights and biases of each layer are views
+# into it. This way a whole generation of children can be made at once out of a (population size, genome length) matrix with make_children.
+# Neural nets (or whole populations of them) can be saved to and loaded from a compact binary file, or handed to other processes through
+# shared memory with SharedPopulation. Everything random takes an explicit numpy random Generator, so that a run started with the same seed
+# creates exactly the same neural nets.
 #
 # Jacob Karty 12/3/2024
 
 import numpy as np
+import json
+import os
 
 class NeuralNetwork:
-    """Initialize the neural net. The input is an array of integers. Each integer represents the number of nodes in that layer."""
-    def __init__(self, inputs):
+    """Initialize the neural net. The input is an array of integers. Each integer represents the number of nodes in that layer. If a genome
+    (see get_genome) is given, the weights and biases are taken from it instead of being random. rng is the numpy random Generator the
+    random weights and biases are drawn from, a new unseeded one if it is not given. The given genome is used as it is, not copied."""
+    def __init__(self, inputs, genome=None, rng=None):
         self.inputs = inputs
+        if genome is None:
+            if rng is None:
+                rng = np.random.default_rng()
+            genome = rng.random(genome_length(inputs)) * 2 - 1
+        self.genome = genome
         self.weights = []
         self.biases = []
+        start = 0
         for i in range(len(inputs)-1):
-            weight = np.random.rand(inputs[i], inputs[i+1]) * 2 - 1
+            weight = genome[start:start + inputs[i] * inputs[i+1]].reshape(inputs[i], inputs[i+1])
+            start += weight.size
+            bias = genome[start:start + inputs[i+1]].reshape(1, inputs[i+1])
+            start += bias.size
             self.weights.append(weight)
-            bias = np.random.rand(1, inputs[i+1]) * 2 - 1
             self.biases.append(bias)
 
 
@@ -23,9 +40,24 @@ class NeuralNetwork:
     def calculate_forward(self, value):
         for i in range(len(self.weights)):
             value = np.tanh(np.dot(value, self.weights[i])) + self.biases[i]
-        return np.where(value >=0, 1, -1)[0]
+        return np.where(value >= 0, 1, -1)[0]
     
-    """Prints the neural network (instead of creating saves and loads)"""
+    """Returns a copy of every weight and bias of the neural network in a single flat array. The weights of a layer come first, then its
+    biases, then the next layer"""
+    def get_genome(self):
+        return np.array(self.genome)
+
+    """Saves the neural network to a binary file. Any keyword arguments (generation number, mutation rate, fitness, ...) are stored in
+    the file with it"""
+    def save(self, path, **metadata):
+        save_population(path, [self], **metadata)
+
+    """Loads a neural network saved with save (or the agent at index of a saved population), see load_population for copy"""
+    @staticmethod
+    def load(path, index=0, copy=False):
+        return load_population(path, copy)[0][index]
+
+    """Prints the neural network"""
     def print_network(self):
         print("__________________________________________________________________")
         print("Weights:")
@@ -52,66 +84,189 @@ class NeuralNetwork:
         print(out)
     
     """Create a child with another neural network by using a genetic algorithm with the weights and biases of the
-    neural network"""
-    def make_child(self, other, mutation_rate=0.1):
-        child = NeuralNetwork(self.inputs)
-        child.weights = []
-        child.biases = []
-        for i in range(len(self.inputs)-1):
-            child_weight = self.random_mix(self.weights[i], other.weights[i])
-            child_weight = self.mutate_child(child_weight, mutation_rate)
-            child.weights.append(child_weight)
-            child_bias = self.random_mix(self.biases[i], other.biases[i])
-            child_bias = self.mutate_child(child_bias, mutation_rate)
-            child.biases.append(child_bias)
-        return child
-
-    """Helper function to cross over the two parents"""
-    def random_mix(self, X, Y):
-        choice = np.random.randint(2, size = X.size).reshape(X.shape).astype(bool)
-        return np.where(choice, X, Y)
+    neural network. rng is the numpy random Generator the crossover and mutation are drawn from, a new unseeded one if it is not given"""
+    def make_child(self, other, mutation_rate=0.1, rng=None):
+        if rng is None:
+            rng = np.random.default_rng()
+        child = self.random_mix(self.genome, other.genome, rng)
+        self.mutate_child(child, mutation_rate, rng)
+        return NeuralNetwork(self.inputs, child)
+
+    """Helper function to cross over the two parents. X and Y are genomes, or matrices of genomes with a row for each child. Returns a new
+    array that takes each value from X or Y at random"""
+    @staticmethod
+    def random_mix(X, Y, rng):
+        child = np.array(Y, dtype=float)
+        return copy_where(child, np.asarray(X, dtype=float), rng.integers(2, size=child.shape, dtype=bool))
     
-    """Helper function to indroduce randomness to the system through mutation"""
-    def mutate_child(self, matrix, mutation_rate):
-        mask = np.random.rand(matrix.size).reshape(matrix.shape)
-        return np.where(mask>mutation_rate, matrix, matrix + np.random.rand()*mutation_rate - mutation_rate/2)
+    """Helper function to indroduce randomness to the system through mutation. Each value of matrix has a mutation_rate chance of having
+    its own random value between -mutation_rate/2 and mutation_rate/2 added to it. matrix is changed in place and returned. Rather than
+    drawing a number for every value, only the gaps between the mutated values are drawn, which are geometric for independent chances"""
+    @staticmethod
+    def mutate_child(matrix, mutation_rate, rng):
+        values = matrix.reshape(-1) # a view, as matrix is contiguous
+        if mutation_rate <= 0 or values.size == 0:
+            return matrix
+        count = int(values.size * min(mutation_rate, 1) + 6 * np.sqrt(values.size) + 10) # nearly always more gaps than are needed
+        mutated = np.cumsum(rng.geometric(min(mutation_rate, 1), count)) - 1
+        while mutated[-1] < values.size:
+            mutated = np.concatenate([mutated, mutated[-1] + np.cumsum(rng.geometric(min(mutation_rate, 1), count))])
+        mutated = mutated[:np.searchsorted(mutated, values.size)]
+        values[mutated] += rng.random(len(mutated)) * mutation_rate - mutation_rate/2
+        return matrix
     
     """Generates a 2D matrix where the each value represents the number of children agents i and j create. inputs
     are the number of parent agents and the number of children desired"""
     def generate_weighted_reproduction_matrix(num_parents, num_children):
-        # Calculate weights for each pair (i, j)
-        pairs = [(i, j) for i in range(num_parents) for j in range(i + 1, num_parents)]
-        weights = np.array([(num_parents - i) + (num_parents - j) for i, j in pairs])
+        # Calculate weights for each pair (i, j), with i < j
+        first, second = np.triu_indices(num_parents, 1)
+        weights = (num_parents - first) + (num_parents - second)
         total_weight = weights.sum()
         
         # Allocate children proportionally
-        allocated_children = (weights * num_children) // (total_weight)
         out = np.zeros((num_parents, num_parents), dtype=int)
-        for idx, (i, j) in enumerate(pairs):
-            out[i, j] = allocated_children[idx]
+        out[first, second] = (weights * num_children) // (total_weight)
         
         # Account for rounding errors by distribuitng remaining children to ramaining heavily weighted pairs
-        total_allocated = allocated_children.sum()
-        remaining_children = num_children - total_allocated
-        sorted_indices = np.argsort(-weights)
-        for idx in sorted_indices:
-            if remaining_children <= 0:
-                break
-            i, j = pairs[idx]
-            out[i, j] += 1
-            remaining_children -= 1
+        remaining_children = num_children - out.sum()
+        if remaining_children > 0:
+            heaviest = np.argsort(-weights)[:remaining_children]
+            out[first[heaviest], second[heaviest]] += 1
         
         return out
 
+
+class Population:
+    """Holds a whole population of neural networks that all have the same layers. The weights and biases of every network are stacked
+    into 3D arrays of shape (population size, inputs, outputs), so that all the agents can be calculated forward at the same time"""
+    def __init__(self, networks):
+        self.inputs = networks[0].inputs
+        self.weights = []
+        self.biases = []
+        for i in range(len(self.inputs)-1):
+            self.weights.append(np.stack([network.weights[i] for network in networks]))
+            self.biases.append(np.stack([network.biases[i] for network in networks]))
+
+    """The number of networks in the population"""
+    def __len__(self):
+        return len(self.weights[0])
+
+    """calculates through every network at once with a single matrix multiplication per layer. values is a (population size, inputs)
+    array with a state for each agent. Returns a (population size, outputs) array with the same 1s and -1s calculate_forward of each
+    network would give"""
+    def calculate_forward(self, values):
+        value = np.asarray(values)[:, np.newaxis, :]
+        for i in range(len(self.weights)):
+            value = np.tanh(np.matmul(value, self.weights[i])) + self.biases[i]
+        return np.where(value >=0, 1, -1)[:, 0, :]
+
+
+class SharedPopulation:
+    """Holds the genomes of up to capacity neural networks with the given layers, and a distance and fitness for each, in a single block of
+    shared memory, so that other processes can read the networks and write their results without anything being pickled. The block is
+    created if name is not given, and attached to otherwise (see handle). The networks in agents are views into the block, so they always
+    have the genomes last written. Every network also gets a row of stats further values in stats, such as the steps and the time of every
+    phase of its episode. Processes that attach have to share the resource tracker of the process that created the block, which removes it
+    when that process exits: start it with multiprocessing.resource_tracker.ensure_running before starting them (see ParallelEvaluator)"""
+    def __init__(self, layers, capacity, name=None, stats=0):
+        self.layers = list(layers)
+        self.capacity = capacity
+        from multiprocessing import shared_memory
+        length = genome_length(layers)
+        self.memory = shared_memory.SharedMemory(name=name, create=name is None, size=capacity * (length + 2 + stats) * 8)
+        self.name = self.memory.name
+        self.genomes = np.ndarray((capacity, length), dtype=float, buffer=self.memory.buf)
+        self.distances = np.ndarray(capacity, dtype=float, buffer=self.memory.buf, offset=self.genomes.nbytes)
+        self.fitnesses = np.ndarray(capacity, dtype=float, buffer=self.memory.buf, offset=self.genomes.nbytes + self.distances.nbytes)
+        self.stats = np.ndarray((capacity, stats), dtype=float, buffer=self.memory.buf, offset=self.genomes.nbytes + 2 * self.distances.nbytes)
+        self.agents = [NeuralNetwork(self.layers, genome) for genome in self.genomes]
+
+    """What another process needs to attach to the block, as the arguments of SharedPopulation"""
+    def handle(self):
+        return self.layers, self.capacity, self.name, self.stats.shape[1]
+
+    """Copies the genomes of networks into the block, the first network into the first row"""
+    def write(self, networks):
+        np.stack([network.genome for network in networks], out=self.genomes[:len(networks)])
+
+    """Detaches from the block, and removes it if unlink is true, which only the process that created it should do"""
+    def close(self, unlink=False):
+        self.agents = self.genomes = self.distances = self.fitnesses = self.stats = None # the block cannot be closed while arrays point into it
+        self.memory.close()
+        if unlink:
+            self.memory.unlink()
+
+
+"""Makes a child for every pair of parents at once. genomes is a (population size, genome length) matrix with the genome of each agent,
+and first_parents and second_parents are the rows of the parents of each child. Returns a (children, genome length) matrix with the genome
+of each child, crossed over and mutated the same way make_child does"""
+def make_children(genomes, first_parents, second_parents, mutation_rate, rng):
+    children = np.take(genomes, second_parents, axis=0)
+    copy_where(children, np.take(genomes, first_parents, axis=0), rng.integers(2, size=children.shape, dtype=bool))
+    return NeuralNetwork.mutate_child(children, mutation_rate, rng)
+
+"""Copies the values of source into the float64 array out where the boolean array where is true, like np.copyto with where, and returns
+out. The bits of the values are selected with a mask instead of a branch per value, which gives exactly the same values and is several
+times faster when where is random"""
+def copy_where(out, source, where):
+    bits = out.view(np.uint64)
+    difference = np.bitwise_xor(source.view(np.uint64), bits)
+    difference *= where # the bits that differ where where is true, zeros elsewhere
+    bits ^= difference
+    return out
+
+"""The number of weights and biases of a neural network with the given layers"""
+def genome_length(layers):
+    return sum(layers[i] * layers[i+1] + layers[i+1] for i in range(len(layers)-1))
+
+file_magic = b'POGONET1'
+
+"""Saves a list of neural networks that all have the same layers to a binary file. The file starts with a short json header holding the
+layers, the number of networks and any keyword arguments given as metadata. After it come the genomes of the networks as raw float64
+values, one row per network, so loading is just memory mapping the file"""
+def save_population(path, networks, **metadata):
+    genomes = np.stack([network.get_genome() for network in networks]).astype('<f8')
+    header = json.dumps({'layers': list(networks[0].inputs), 'count': len(networks), 'metadata': metadata},
+                        default=lambda value: value.tolist()).encode()
+    start = len(file_magic) + 4 + len(header)
+    header += b' ' * (-start % 64) # start the genomes at a multiple of 64 bytes
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as file:
+        file.write(file_magic)
+        file.write(len(header).to_bytes(4, 'little'))
+        file.write(header)
+        file.write(genomes.tobytes())
+
+"""Loads the neural networks saved with save_population. The weights and biases of the networks are views into the memory mapped file,
+and are only read from disk when they are used. If copy is true they are read into memory right away instead, so that the file can be
+replaced or removed. Returns the list of networks and the metadata dictionary"""
+def load_population(path, copy=False):
+    with open(path, 'rb') as file:
+        if file.read(len(file_magic)) != file_magic:
+            raise ValueError(f"{path} is not a saved neural network")
+        header_length = int.from_bytes(file.read(4), 'little')
+        header = json.loads(file.read(header_length))
+    layers = header['layers']
+    genomes = np.memmap(path, dtype='<f8', mode='c', offset=len(file_magic) + 4 + header_length,
+                        shape=(header['count'], genome_length(layers)))
+    if copy:
+        genomes = np.array(genomes)
+    return [NeuralNetwork(layers, genome) for genome in genomes], header['metadata']
+
 # test the neural network
 if __name__ == '__main__':
-    test1 = NeuralNetwork([2, 3])
+    rng = np.random.default_rng(0)
+    test1 = NeuralNetwork([2, 3], rng=rng)
     test1.print_network()
 
-    test2 = NeuralNetwork([2, 3])
+    test2 = NeuralNetwork([2, 3], rng=rng)
     test2.print_network()
 
-    child = test1.make_child(test2, 0.1)
+    child = test1.make_child(test2, 0.1, rng)
     child.print_network()
 
-    print(child.calculate_forward([1, 2]))
\ No newline at end of file
+    print(child.calculate_forward([1, 2]))
+
+    population = Population([test1, test2, child])
+    print(population.calculate_forward([[1, 2], [1, 2], [1, 2]]))
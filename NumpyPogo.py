@@ -0,0 +1,423 @@
+# This is a pure numpy version of the pogo simulation that steps thousands of pogos at once. It has the same interface as MultiPogo, so a
+# whole population can be evaluated with run_generation on either of them. The 3 bodies, the 4 damped springs, the contacts between the
+# bodies and the contacts with the ground are simulated with the same integration order, spring impulses and contact impulses Pymunk
+# (Chipmunk) uses. Chipmunk solves the contacts one after another, which does not vectorize, so here all the contacts are solved at the same
+# time and each body's mass is split between the contacts touching it. The results are close to Pymunk but not the same, so Pymunk stays
+# the reference, and validate_numpy_pogo.py reports how far the two drift apart.
+#
+# This backend is experimental and fails that validation: it ranks a random population too differently from Pymunk to select the same
+# agents, so training never uses it unless numpy_physics is set in main.py.
+#
+# Jacob Karty 12/4/2024
+
+from Pogo import Pogo
+import numpy as np
+
+class NumpyPogo:
+    """Simulates num_agents pogos at the same time. The shapes, masses and springs are read from a Pymunk Pogo, so the two always describe
+    the same pogo. Every shape of the pogo has to be a box that is not rotated on its body, which is what the Pogo is made of"""
+    def __init__(self, num_agents, time_step=1 / 60.0, action_repeat=1):
+        self.num_agents = num_agents
+        self.time_step = time_step
+        self.action_repeat = action_repeat # see Pogo
+        template = Pogo(time_step)
+        self.spring_jump_distance = template.spring_jump_distance
+        self.jumping_spring_rest_length = template.jumping_spring_rest_length
+        self.top_spring_rest_length = template.top_spring_rest_length
+        self.bottom_spring_rest_length = template.bottom_spring_rest_length
+
+        # the bodies, in the order pogo, person, jumping box, and the ground last. The ground never moves, which an inverse mass of 0 takes
+        # care of
+        bodies = [template.pogo_body, template.pogo_body_2, template.jumping_spring.b]
+        self.start_positions = np.array([tuple(body.position) for body in bodies] + [(0, 0)])
+        self.start_angles = np.array([body.angle for body in bodies] + [0])
+        self.mass_inverse = np.array([1 / body.mass for body in bodies] + [0])
+        self.moment_inverse = np.array([1 / body.moment for body in bodies] + [0])
+        self.gravity = tuple(template.space.gravity)
+        self.iterations = template.space.iterations
+        self.bias_coefficient = 1 - template.space.collision_bias ** time_step
+        self.collision_slop = template.space.collision_slop
+
+        # the ground is a thick line, and pogos only collide with its top surface
+        ground = [shape for shape in template.space.shapes if shape.body is template.space.static_body][0]
+        self.ground_top = ground.a.y - ground.radius
+        self.ground_left = ground.a.x - ground.radius
+        self.ground_right = ground.b.x + ground.radius
+
+        # the boxes, as their center and half their size on the body, and their corners
+        shapes = [shape for body in bodies for shape in body.shapes]
+        corners = [np.array([tuple(vertex) for vertex in shape.get_vertices()]) for shape in shapes]
+        self.shape_bodies = np.array([bodies.index(shape.body) for shape in shapes])
+        self.shape_centers = np.array([(corner.min(axis=0) + corner.max(axis=0)) / 2 for corner in corners])
+        self.shape_sizes = np.array([(corner.max(axis=0) - corner.min(axis=0)) / 2 for corner in corners])
+        self.vertices = np.concatenate(corners)
+        self.vertex_shapes = np.repeat(np.arange(len(shapes)), [len(corner) for corner in corners])
+        self.vertex_bodies = self.shape_bodies[self.vertex_shapes]
+
+        # Every contact is either a corner in the ground, or one of the up to 2 points where a box of one body overlaps a box of another
+        self.pair_a, self.pair_b = np.array([(a, b) for a in range(len(shapes)) for b in range(a + 1, len(shapes))
+                                             if self.shape_bodies[a] != self.shape_bodies[b]]).T
+        friction = np.array([shape.friction for shape in shapes])
+        elasticity = np.array([shape.elasticity for shape in shapes])
+        self.contact_friction = np.concatenate((friction[self.vertex_shapes] * ground.friction,
+                                                np.repeat(friction[self.pair_a] * friction[self.pair_b], 2)))
+        self.contact_elasticity = np.concatenate((elasticity[self.vertex_shapes] * ground.elasticity,
+                                                  np.repeat(elasticity[self.pair_a] * elasticity[self.pair_b], 2)))
+
+        # the springs, in the order they were added to the space (bottom, top, very top, jumping)
+        springs = list(template.space.constraints)
+        self.spring_bodies = [(bodies.index(spring.a), bodies.index(spring.b)) for spring in springs]
+        self.spring_anchors = [(tuple(spring.anchor_a), tuple(spring.anchor_b)) for spring in springs]
+        self.spring_stiffness = [spring.stiffness for spring in springs]
+        self.spring_damping = [spring.damping for spring in springs]
+        self.start_rest_lengths = np.array([spring.rest_length for spring in springs])
+        self.bottom_index = springs.index(template.bottom_spring)
+        self.top_index = springs.index(template.top_spring)
+        self.jumping_index = springs.index(template.jumping_spring)
+
+        self.reset_simulation()
+
+    """The simulated time in seconds since the last reset"""
+    @property
+    def sim_time(self):
+        return self.steps * self.time_step
+
+    """Returns a (num_agents, 12) array where each row is the state get_current_state of Pogo would give for that pogo. The rows of
+    pogos that have been removed keep their last state. If out is given, the states are written into it instead and it is returned"""
+    def get_current_state(self, out=None):
+        state = self.state if out is None else out
+        active = self.active[self.agents]
+        agents = self.agents[active]
+        for i in range(2): # the pogo and the person
+            state[agents, 6*i] = self.angles[i, active]
+            state[agents, 6*i + 1] = self.angular_velocities[i, active]
+            state[agents, 6*i + 2] = self.x[i, active]
+            state[agents, 6*i + 3] = self.y[i, active]
+            state[agents, 6*i + 4] = self.velocity_x[i, active]
+            state[agents, 6*i + 5] = self.velocity_y[i, active]
+        return state
+
+    """Takes a (num_agents, 5) array of actions, one row per pogo, and applies them like apply_actions of Pogo does"""
+    def apply_actions(self, actions):
+        actions = np.asarray(actions)
+
+        #jump, and revert the jumps that were pressed at least 0.1 seconds ago
+        jump = self.active & (actions[:, 0] == 1) & (self.sim_time - self.press_time >= 0.2)
+        self.jump_pressed |= jump
+        self.press_time[jump] = self.sim_time
+        self.rest_lengths[jump, self.jumping_index] += self.spring_jump_distance
+        self.release_jump()
+
+        #top spring right, left, and center, and bottom spring right, left, and center
+        top = np.where(actions[:, 1] == 1, 20, np.where(actions[:, 2] == 1, -20, 0)) + self.top_spring_rest_length
+        bottom = np.where(actions[:, 3] == 1, -20, np.where(actions[:, 4] == 1, 20, 0)) + self.bottom_spring_rest_length
+        self.rest_lengths[self.active, self.top_index] = top[self.active]
+        self.rest_lengths[self.active, self.bottom_index] = bottom[self.active]
+
+    """Reverts the jumping spring of every pogo whose jump has been held for 0.1 seconds"""
+    def release_jump(self):
+        if not self.jump_pressed.any():
+            return
+        revert = self.active & self.jump_pressed & (self.sim_time - self.press_time >= .1)
+        self.jump_pressed &= ~revert
+        self.rest_lengths[revert, self.jumping_index] = self.jumping_spring_rest_length
+
+    """Takes a (num_agents, 2) array of velocities and adds each to every body of that pogo, like push of Pogo does"""
+    def push(self, velocities):
+        velocities = np.asarray(velocities)[self.agents]
+        self.velocity_x[:3] += velocities[:, 0]
+        self.velocity_y[:3] += velocities[:, 1]
+
+    """Takes the pogo of agent i out of the simulation, for example once its episode is over, so that it no longer costs any time to step"""
+    def remove_agent(self, i):
+        self.active[i] = False
+
+    """Puts every pogo back to its starting position. The simulated clock starts again at 0"""
+    def reset_simulation(self):
+        n = self.num_agents
+        self.steps = 0
+        self.jump_pressed = np.zeros(n, dtype=bool)
+        self.press_time = np.full(n, -1.0) # long enough ago that the agents can jump right away
+        self.active = np.ones(n, dtype=bool)
+        self.rest_lengths = np.tile(self.start_rest_lengths, (n, 1))
+        self.state = np.zeros((n, 12))
+
+        # The bodies of the pogos that are still simulated, one row per body and one column per pogo. agents is the agent each column
+        # belongs to, and the columns of removed pogos are dropped at the next step
+        self.agents = np.arange(n)
+        self.x = np.tile(self.start_positions[:, 0, None], (1, n))
+        self.y = np.tile(self.start_positions[:, 1, None], (1, n))
+        self.angles = np.tile(self.start_angles[:, None], (1, n))
+        # The x, y and angular velocities, and the velocities that push apart shapes that sank into each other, which only last for a single
+        # step. They are kept in a single array so that the contacts can change all of them at once
+        self.motion = np.zeros((6, 4, n))
+        self.velocities, self.bias = self.motion[:3], self.motion[3:]
+        self.velocity_x, self.velocity_y, self.angular_velocities = self.velocities
+        self.bias_x, self.bias_y, self.bias_angular = self.bias
+
+        # the impulses of every contact from the last step, used to warm start the solver like Chipmunk does
+        self.normal_impulses = np.zeros((len(self.contact_friction), n))
+        self.friction_impulses = np.zeros((len(self.contact_friction), n))
+
+    """Steps every pogo forward by the given number of time steps and advances the simulated clock, releasing jumps like step of Pogo"""
+    def step(self, steps=1):
+        for i in range(steps):
+            self.release_jump()
+            self.step_once()
+
+    """Helper function for step that steps every pogo forward by a single time step"""
+    def step_once(self):
+        dt = self.time_step
+        self.remove_columns()
+        n = len(self.agents)
+        rest_lengths = self.rest_lengths[self.agents]
+
+        # Integrate the positions, including the push apart from the last step
+        self.x += (self.velocity_x + self.bias_x) * dt
+        self.y += (self.velocity_y + self.bias_y) * dt
+        self.angles += (self.angular_velocities + self.bias_angular) * dt
+        self.bias[:] = 0
+        cos, sin = np.cos(self.angles), np.sin(self.angles)
+
+        # Find the contacts and prepare them. Each body's mass is split evenly between the contacts touching it
+        rig, contact, body_a, body_b, normal_x, normal_y, separation, point_x, point_y, num_ground = self.find_contacts(cos, sin)
+        index_a, index_b = body_a * n + rig, body_b * n + rig
+        r_a_x, r_a_y = point_x - self.x[body_a, rig], point_y - self.y[body_a, rig]
+        r_b_x, r_b_y = point_x - self.x[body_b, rig], point_y - self.y[body_b, rig]
+        contacts = Contacts(index_a, index_b, r_a_x, r_a_y, r_b_x, r_b_y, self.mass_inverse[body_a],
+                            self.mass_inverse[body_b], self.moment_inverse[body_a], self.moment_inverse[body_b], n * 4, num_ground)
+        count = np.bincount(np.concatenate((index_a, index_b)), minlength=n * 4)
+        mass = self.mass_inverse[body_a] * count[index_a] + self.mass_inverse[body_b] * count[index_b]
+        moment_a, moment_b = self.moment_inverse[body_a] * count[index_a], self.moment_inverse[body_b] * count[index_b]
+        normal_mass = 1 / (mass + moment_a * (r_a_x * normal_y - r_a_y * normal_x) ** 2 + moment_b * (r_b_x * normal_y - r_b_y * normal_x) ** 2)
+        tangent_mass = 1 / (mass + moment_a * (r_a_x * normal_x + r_a_y * normal_y) ** 2 + moment_b * (r_b_x * normal_x + r_b_y * normal_y) ** 2)
+        bias = -self.bias_coefficient * np.minimum(0, separation + self.collision_slop) / dt
+        velocity_x, velocity_y, bias_x, bias_y = contacts.relative_velocity(self.motion)
+        bounce = (velocity_x * normal_x + velocity_y * normal_y) * self.contact_elasticity[contact]
+        friction = self.contact_friction[contact]
+        normal_impulse = self.normal_impulses[contact, rig]
+        friction_impulse = self.friction_impulses[contact, rig]
+        bias_impulse = np.zeros(len(rig))
+
+        # Prepare the springs and apply the spring forces
+        springs = []
+        for s, (i, j) in enumerate(self.spring_bodies):
+            (anchor_a_x, anchor_a_y), (anchor_b_x, anchor_b_y) = self.spring_anchors[s]
+            r1_x, r1_y = anchor_a_x * cos[i] - anchor_a_y * sin[i], anchor_a_x * sin[i] + anchor_a_y * cos[i]
+            r2_x, r2_y = anchor_b_x * cos[j] - anchor_b_y * sin[j], anchor_b_x * sin[j] + anchor_b_y * cos[j]
+            delta_x = self.x[j] + r2_x - self.x[i] - r1_x
+            delta_y = self.y[j] + r2_y - self.y[i] - r1_y
+            distance = np.sqrt(delta_x ** 2 + delta_y ** 2)
+            direction_x, direction_y = delta_x / np.where(distance > 0, distance, np.inf), delta_y / np.where(distance > 0, distance, np.inf)
+            k = (self.mass_inverse[i] + self.moment_inverse[i] * (r1_x * direction_y - r1_y * direction_x) ** 2 +
+                 self.mass_inverse[j] + self.moment_inverse[j] * (r2_x * direction_y - r2_y * direction_x) ** 2)
+            spring = (i, j, r1_x, r1_y, r2_x, r2_y, direction_x, direction_y, 1 / k, 1 - np.exp(-self.spring_damping[s] * dt * k),
+                      np.zeros(n))
+            self.apply_spring_impulse(spring, (rest_lengths[:, s] - distance) * self.spring_stiffness[s] * dt)
+            springs.append(spring)
+
+        # Integrate the velocities, then warm start the contacts with the impulses from the last step
+        self.velocity_x[:3] += self.gravity[0] * dt
+        self.velocity_y[:3] += self.gravity[1] * dt
+        no_bias = np.zeros(len(rig))
+        contacts.apply_impulse(self.motion, normal_x * normal_impulse - normal_y * friction_impulse,
+                               normal_y * normal_impulse + normal_x * friction_impulse, no_bias, no_bias)
+
+        # Run the impulse solver
+        for iteration in range(self.iterations):
+            # push apart the shapes that sank into each other, which only changes the bias velocities
+            velocity_x, velocity_y, bias_x, bias_y = contacts.relative_velocity(self.motion)
+            old = bias_impulse
+            bias_impulse = np.maximum(old + (bias - bias_x * normal_x - bias_y * normal_y) * normal_mass, 0)
+            change_bias = bias_impulse - old
+
+            # the contacts and the friction. The tangent is the normal rotated by 90 degrees
+            old_normal, old_friction = normal_impulse, friction_impulse
+            normal_impulse = np.maximum(old_normal - (bounce + velocity_x * normal_x + velocity_y * normal_y) * normal_mass, 0)
+            friction_max = friction * normal_impulse
+            friction_impulse = np.clip(old_friction - (velocity_y * normal_x - velocity_x * normal_y) * tangent_mass, -friction_max, friction_max)
+            change_normal, change_friction = normal_impulse - old_normal, friction_impulse - old_friction
+            contacts.apply_impulse(self.motion, normal_x * change_normal - normal_y * change_friction,
+                                   normal_y * change_normal + normal_x * change_friction, normal_x * change_bias, normal_y * change_bias)
+
+            # the damping of the springs
+            for spring in springs:
+                i, j, r1_x, r1_y, r2_x, r2_y, direction_x, direction_y, spring_mass, velocity_coefficient, target = spring
+                normal_velocity = ((self.velocity_x[j] - r2_y * self.angular_velocities[j] - self.velocity_x[i] +
+                                    r1_y * self.angular_velocities[i]) * direction_x +
+                                   (self.velocity_y[j] + r2_x * self.angular_velocities[j] - self.velocity_y[i] -
+                                    r1_x * self.angular_velocities[i]) * direction_y)
+                damping = (target - normal_velocity) * velocity_coefficient
+                target[:] = normal_velocity + damping
+                self.apply_spring_impulse(spring, damping * spring_mass)
+
+        # keep the impulses of the contacts for the next step
+        self.normal_impulses = np.zeros_like(self.normal_impulses)
+        self.friction_impulses = np.zeros_like(self.friction_impulses)
+        self.normal_impulses[contact, rig] = normal_impulse
+        self.friction_impulses[contact, rig] = friction_impulse
+        self.steps += 1
+
+    """Helper function for step that drops the columns of the pogos that have been removed"""
+    def remove_columns(self):
+        keep = self.active[self.agents]
+        if keep.all():
+            return
+        self.agents = self.agents[keep]
+        self.x, self.y, self.angles = self.x[:, keep], self.y[:, keep], self.angles[:, keep]
+        self.motion = np.ascontiguousarray(self.motion[:, :, keep]) # the contacts change it through a flattened view
+        self.velocities, self.bias = self.motion[:3], self.motion[3:]
+        self.velocity_x, self.velocity_y, self.angular_velocities = self.velocities
+        self.bias_x, self.bias_y, self.bias_angular = self.bias
+        self.normal_impulses, self.friction_impulses = self.normal_impulses[:, keep], self.friction_impulses[:, keep]
+
+    """Helper function for step that finds where the shapes of every pogo touch the ground or each other. Returns one entry per contact:
+    the pogo, the contact number, the two bodies that touch (a and b), the normal pointing from body a to body b, how far apart the two are
+    (negative when they overlap), and where the contact is. The contacts with the ground come first, and the number of them is returned
+    last"""
+    def find_contacts(self, cos, sin):
+        # the corners in the ground
+        body = self.vertex_bodies
+        vertex_x = self.x[body] + self.vertices[:, 0, None] * cos[body] - self.vertices[:, 1, None] * sin[body]
+        vertex_y = self.y[body] + self.vertices[:, 0, None] * sin[body] + self.vertices[:, 1, None] * cos[body]
+        touching = (vertex_y > self.ground_top) & (vertex_x > self.ground_left) & (vertex_x < self.ground_right)
+        ground_vertex, ground_rig = np.nonzero(touching)
+
+        # The boxes of different bodies that overlap. Two boxes overlap when they overlap along each of their 4 sides (separating axes)
+        body = self.shape_bodies
+        center_x = self.x[body] + self.shape_centers[:, 0, None] * cos[body] - self.shape_centers[:, 1, None] * sin[body]
+        center_y = self.y[body] + self.shape_centers[:, 0, None] * sin[body] + self.shape_centers[:, 1, None] * cos[body]
+        a, b = self.pair_a, self.pair_b
+        cos_a, sin_a, cos_b, sin_b = cos[body[a]], sin[body[a]], cos[body[b]], sin[body[b]]
+        distance_x, distance_y = center_x[b] - center_x[a], center_y[b] - center_y[a]
+        cos_between = np.abs(cos_a * cos_b + sin_a * sin_b)
+        sin_between = np.abs(sin_a * cos_b - cos_a * sin_b)
+        (size_a_x, size_a_y), (size_b_x, size_b_y) = self.shape_sizes[a].T[:, :, None], self.shape_sizes[b].T[:, :, None]
+        distance_a_x, distance_a_y = distance_x * cos_a + distance_y * sin_a, distance_y * cos_a - distance_x * sin_a
+        distance_b_x, distance_b_y = distance_x * cos_b + distance_y * sin_b, distance_y * cos_b - distance_x * sin_b
+        overlap_a_x = size_a_x + size_b_x * cos_between + size_b_y * sin_between - np.abs(distance_a_x)
+        overlap_a_y = size_a_y + size_b_x * sin_between + size_b_y * cos_between - np.abs(distance_a_y)
+        overlap_b_x = size_b_x + size_a_x * cos_between + size_a_y * sin_between - np.abs(distance_b_x)
+        overlap_b_y = size_b_y + size_a_x * sin_between + size_a_y * cos_between - np.abs(distance_b_y)
+        overlapping = (np.minimum(np.minimum(overlap_a_x, overlap_a_y), np.minimum(overlap_b_x, overlap_b_y)) > 0)
+        pair, rig = np.nonzero(overlapping)
+
+        # The box that overlaps the least along one of its sides is the reference box, and the other box is pushed out of that side.
+        # Box a is preferred, so that the contacts do not jump between the boxes when both overlap about as much
+        overlap_a = np.minimum(overlap_a_x[pair, rig], overlap_a_y[pair, rig])
+        overlap_b = np.minimum(overlap_b_x[pair, rig], overlap_b_y[pair, rig])
+        flip = overlap_b < 0.98 * overlap_a - 0.001
+        a, b = self.pair_a[pair], self.pair_b[pair]
+        reference, incident = np.where(flip, b, a), np.where(flip, a, b)
+        reference_body, incident_body = self.shape_bodies[reference], self.shape_bodies[incident]
+        reference_cos, reference_sin = cos[reference_body, rig], sin[reference_body, rig]
+        incident_cos, incident_sin = cos[incident_body, rig], sin[incident_body, rig]
+        reference_x, reference_y = center_x[reference, rig], center_y[reference, rig]
+        incident_x, incident_y = center_x[incident, rig], center_y[incident, rig]
+        (reference_size_x, reference_size_y), (incident_size_x, incident_size_y) = self.shape_sizes[reference].T, self.shape_sizes[incident].T
+
+        # the side of the reference box is the one facing the incident box, along the axis the reference box overlaps the least
+        along_x = np.where(flip, overlap_b_x[pair, rig] < overlap_b_y[pair, rig], overlap_a_x[pair, rig] < overlap_a_y[pair, rig])
+        axis_x = np.where(along_x, reference_cos, -reference_sin)
+        axis_y = np.where(along_x, reference_sin, reference_cos)
+        facing = np.where((incident_x - reference_x) * axis_x + (incident_y - reference_y) * axis_y >= 0, 1, -1)
+        normal_x, normal_y = axis_x * facing, axis_y * facing
+        depth = np.where(along_x, reference_size_x, reference_size_y)
+        side = np.where(along_x, reference_size_y, reference_size_x)
+
+        # the side of the incident box that faces the reference box the most
+        along_incident_x = np.abs(normal_x * incident_cos + normal_y * incident_sin) > np.abs(normal_y * incident_cos - normal_x * incident_sin)
+        face_x = np.where(along_incident_x, incident_cos, -incident_sin)
+        face_y = np.where(along_incident_x, incident_sin, incident_cos)
+        facing = np.where(face_x * normal_x + face_y * normal_y >= 0, -1, 1)
+        face_x, face_y = face_x * facing, face_y * facing
+        face_size = np.where(along_incident_x, incident_size_x, incident_size_y)
+        edge_size = np.where(along_incident_x, incident_size_y, incident_size_x)
+        start_x = incident_x + face_x * face_size + face_y * edge_size
+        start_y = incident_y + face_y * face_size - face_x * edge_size
+        edge_x, edge_y = -2 * face_y * edge_size, 2 * face_x * edge_size
+
+        # Clip that side of the incident box to the side of the reference box. The two ends that are behind the side are the contacts
+        start = (start_x - reference_x) * -normal_y + (start_y - reference_y) * normal_x
+        length = edge_x * -normal_y + edge_y * normal_x
+        length = np.where(np.abs(length) > 1e-9, length, 1e-9)
+        contact_rig, contact, body_a, body_b, contact_normal_x, contact_normal_y, separation, point_x, point_y = [], [], [], [], [], [], [], [], []
+        for end in range(2):
+            fraction = np.clip((np.clip(start + length * end, -side, side) - start) / length, 0, 1)
+            end_x, end_y = start_x + edge_x * fraction, start_y + edge_y * fraction
+            end_separation = (end_x - reference_x) * normal_x + (end_y - reference_y) * normal_y - depth
+            behind = end_separation < 0
+            contact_rig.append(rig[behind])
+            contact.append(len(self.vertices) + pair[behind] * 2 + end)
+            body_a.append(reference_body[behind])
+            body_b.append(incident_body[behind])
+            contact_normal_x.append(normal_x[behind])
+            contact_normal_y.append(normal_y[behind])
+            separation.append(end_separation[behind])
+            point_x.append(end_x[behind])
+            point_y.append(end_y[behind])
+
+        # the ground is body 3, and pushes straight up
+        contact_rig.insert(0, ground_rig)
+        contact.insert(0, ground_vertex)
+        body_a.insert(0, np.full(len(ground_rig), 3))
+        body_b.insert(0, self.vertex_bodies[ground_vertex])
+        contact_normal_x.insert(0, np.zeros(len(ground_rig)))
+        contact_normal_y.insert(0, np.full(len(ground_rig), -1.0))
+        separation.insert(0, self.ground_top - vertex_y[ground_vertex, ground_rig])
+        point_x.insert(0, vertex_x[ground_vertex, ground_rig])
+        point_y.insert(0, vertex_y[ground_vertex, ground_rig])
+        return tuple(np.concatenate(values) for values in (contact_rig, contact, body_a, body_b, contact_normal_x, contact_normal_y,
+                                                            separation, point_x, point_y)) + (len(ground_rig),)
+
+    """Helper function for step that applies an impulse along a spring to body j of every pogo and the opposite impulse to body i"""
+    def apply_spring_impulse(self, spring, impulse):
+        i, j, r1_x, r1_y, r2_x, r2_y, direction_x, direction_y = spring[:8]
+        impulse_x, impulse_y = direction_x * impulse, direction_y * impulse
+        self.velocity_x[i] -= impulse_x * self.mass_inverse[i]
+        self.velocity_y[i] -= impulse_y * self.mass_inverse[i]
+        self.angular_velocities[i] -= self.moment_inverse[i] * (r1_x * impulse_y - r1_y * impulse_x)
+        self.velocity_x[j] += impulse_x * self.mass_inverse[j]
+        self.velocity_y[j] += impulse_y * self.mass_inverse[j]
+        self.angular_velocities[j] += self.moment_inverse[j] * (r2_x * impulse_y - r2_y * impulse_x)
+
+class Contacts:
+    """The contacts of a single step. index_a and index_b are the bodies (body * pogos + pogo) each contact pushes apart, r_a and r_b are
+    where the contact is relative to the centers of those bodies, and the masses and moments are their inverse masses and moments of
+    inertia. Body a of the first num_ground contacts is the ground, which never moves, so only body b of those contacts is used"""
+    def __init__(self, index_a, index_b, r_a_x, r_a_y, r_b_x, r_b_y, mass_a, mass_b, moment_a, moment_b, num_bodies, num_ground):
+        self.num_ground = num_ground
+        self.r_a_x, self.r_a_y = r_a_x[num_ground:], r_a_y[num_ground:]
+        self.r_b_x, self.r_b_y = r_b_x, r_b_y
+        self.size = 6 * num_bodies
+
+        # where the 6 velocities (x, y, angular and their bias) of both ends of every contact are in the flattened motion array, so that all
+        # the impulses are added to the bodies at once
+        rows = np.arange(6)[:, None] * num_bodies
+        self.index_a = (index_a[num_ground:] + rows).reshape(-1)
+        self.index_b = (index_b + rows).reshape(-1)
+        self.index = (np.concatenate((index_a[num_ground:], index_b)) + rows).reshape(-1)
+        self.r_x, self.r_y = np.concatenate((self.r_a_x, r_b_x)), np.concatenate((self.r_a_y, r_b_y))
+        self.mass = np.concatenate((-mass_a[num_ground:], mass_b))
+        self.moment = np.concatenate((-moment_a[num_ground:], moment_b))
+
+    """Returns the velocity and the bias velocity of body b relative to body a at every contact, as velocity x, velocity y, bias x, bias y.
+    motion is the (6, 4, pogos) array of velocities and bias velocities"""
+    def relative_velocity(self, motion):
+        motion = motion.reshape(-1)
+        velocity_x_b, velocity_y_b, angular_b, bias_x_b, bias_y_b, bias_angular_b = motion.take(self.index_b).reshape(6, -1)
+        velocity_x_a, velocity_y_a, angular_a, bias_x_a, bias_y_a, bias_angular_a = motion.take(self.index_a).reshape(6, -1)
+        relative = [velocity_x_b - self.r_b_y * angular_b, velocity_y_b + self.r_b_x * angular_b,
+                    bias_x_b - self.r_b_y * bias_angular_b, bias_y_b + self.r_b_x * bias_angular_b]
+        relative[0][self.num_ground:] -= velocity_x_a - self.r_a_y * angular_a
+        relative[1][self.num_ground:] -= velocity_y_a + self.r_a_x * angular_a
+        relative[2][self.num_ground:] -= bias_x_a - self.r_a_y * bias_angular_a
+        relative[3][self.num_ground:] -= bias_y_a + self.r_a_x * bias_angular_a
+        return relative
+
+    """Applies the impulse and the bias impulse of every contact to body b and the opposite impulses to body a, changing motion in place"""
+    def apply_impulse(self, motion, impulse_x, impulse_y, bias_x, bias_y):
+        impulse_x, impulse_y, bias_x, bias_y = [np.concatenate((impulse[self.num_ground:], impulse)) for impulse in (impulse_x, impulse_y, bias_x, bias_y)]
+        change = np.concatenate((impulse_x * self.mass, impulse_y * self.mass, (self.r_x * impulse_y - self.r_y * impulse_x) * self.moment,
+                                 bias_x * self.mass, bias_y * self.mass, (self.r_x * bias_y - self.r_y * bias_x) * self.moment))
+        motion.reshape(-1)[:] += np.bincount(self.index, change, self.size)
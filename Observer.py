@@ -0,0 +1,63 @@
+# This file turns the state of the pogo into the observation the neural networks take. The state is read straight into an array made once
+# (or a row of an array shared with other agents or processes), so no list is built every step. The observation can be normalized, so that
+# every value is around -1 to 1 instead of positions in the hundreds of pixels saturating the first tanh, and the last few states can be
+# stacked, newest first, so the agent can see how the pogo is moving. With neither, the observation is the state array itself.
+#
+# Jacob Karty 12/9/2024
+
+import numpy as np
+
+state_size = 12 # the values of a state, see get_current_state of Pogo
+
+# the state of a pogo right after a reset, and how far each value typically moves from it (angles are in radians, angular velocities in
+# radians per second, positions in pixels and velocities in pixels per second, for the pogo then the person)
+state_offset = np.array([0, 0, 300, 450, 0, 0, 0, 0, 300, 400, 0, 0], dtype=float)
+state_scale = np.array([1, 5, 100, 50, 100, 100, 1, 5, 100, 50, 100, 100], dtype=float)
+
+class Observer:
+    """num_agents is the number of pogos of a MultiPogo or NumpyPogo, None for a single Pogo. history is how many states are stacked into
+    an observation, and normalize scales every value by state_offset and state_scale. state is the array the state is read into, a
+    (num_agents, 12) array (or 12 for a single pogo) such as a view into shared memory, a new one if it is not given"""
+    def __init__(self, num_agents=None, history=1, normalize=False, state=None):
+        shape = (state_size,) if num_agents is None else (num_agents, state_size)
+        self.history = history
+        self.normalize = normalize
+        self.state = np.zeros(shape) if state is None else state
+        if history == 1 and not normalize:
+            self.observation = self.state
+        else:
+            self.observation = np.zeros(shape[:-1] + (state_size * history,))
+        self.newest = self.observation[..., :state_size]
+        self.inverse_scale = 1 / state_scale
+        self.frames = 0 # the states read since the last reset
+
+    """The number of inputs of a neural network that takes the observations, the first value of its layers"""
+    @property
+    def size(self):
+        return state_size * self.history
+
+    """Starts a new episode, so the next state read fills the whole history"""
+    def reset(self):
+        self.frames = 0
+
+    """Reads the current state of pogo into state, and returns the observation of it. The returned array is reused by the next read"""
+    def read(self, pogo):
+        pogo.get_current_state(self.state)
+        if self.observation is self.state:
+            return self.observation
+        if self.history > 1 and self.frames > 0: # move the older states back by one
+            self.observation[..., state_size:] = self.observation[..., :-state_size]
+        if self.normalize:
+            np.subtract(self.state, state_offset, out=self.newest)
+            self.newest *= self.inverse_scale
+        else:
+            self.newest[...] = self.state
+        if self.frames == 0:
+            for i in range(1, self.history):
+                self.observation[..., state_size * i:state_size * (i + 1)] = self.newest
+        self.frames += 1
+        return self.observation
+
+    """Returns the settings of the observer, which an agent has to be run with to see what it was trained on"""
+    def get_config(self):
+        return {'history': self.history, 'normalize': self.normalize}
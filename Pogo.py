@@ -6,24 +6,55 @@
 # Jacob Karty 12/4/2024
 
 import pymunk
-import time
+from pymunk._chipmunk_cffi import lib
+import numpy as np
+
+# refill_space sets the shape id counter of Chipmunk, which Pymunk only has from 6.5 on. Resets were checked to be bit for bit the same as
+# a new pogo with Pymunk 6.5.0 to 7.3.1, so the README pins pymunk>=6.5,<8
+if not hasattr(lib, 'cpSpaceSetShapeIDCounter'):
+    raise ImportError('Pogo.py needs pymunk 6.5 or newer: pip install "pymunk>=6.5,<8"')
 
 class Pogo:
     
-    def __init__(self):
-        #begin the simulation
-        self.reset_simulation()
-
+    """time_step is the length of a single physics step in seconds. All timing is done in simulated time, counted in these steps, so the
+    pogo behaves the same no matter how fast or slow the simulation is run. action_repeat is the number of steps every action of an agent
+    is held for before the agent decides again (see run_episode), as the springs only take a few settings and a jump lasts 0.1 seconds, so
+    the agent does not need to be calculated forward every step"""
+    def __init__(self, time_step=1 / 60.0, action_repeat=1):
         #global variables
+        self.time_step = time_step
+        self.action_repeat = action_repeat
         self.spring_jump_distance = 100
         self.jumping_spring_rest_length = 30
-        self.jump_pressed = False
         self.top_spring_rest_length = 25
         self.bottom_spring_rest_length = 25
-        self.press_time = time.time()
 
-    """this is the information given to the agent to control the pogo"""
-    def get_current_state(self):
+        #build the simulation once, every reset puts it back in place
+        self.create_simulation()
+        self.reset_simulation()
+
+    """The simulated time in seconds since the last reset"""
+    @property
+    def sim_time(self):
+        return self.steps * self.time_step
+
+    """Steps the simulation forward by the given number of time steps and advances the simulated clock. A jump is released after 0.1
+    seconds even between actions, so a pogo stepped several steps per action jumps the same as one stepped a step at a time"""
+    def step(self, steps=1):
+        for i in range(steps):
+            self.release_jump()
+            self.space.step(self.time_step)
+            self.steps += 1
+
+    """this is the information given to the agent to control the pogo. If out is given, the state is written into it (an array of 12
+    floats) and it is returned, so the state does not need a new list every step"""
+    def get_current_state(self, out=None):
+        if out is not None:
+            position, velocity = self.pogo_body.position, self.pogo_body.velocity
+            position_2, velocity_2 = self.pogo_body_2.position, self.pogo_body_2.velocity
+            out[:] = (self.pogo_body.angle,   self.pogo_body.angular_velocity,   position.x,   position.y,   velocity.x,   velocity.y,
+                      self.pogo_body_2.angle, self.pogo_body_2.angular_velocity, position_2.x, position_2.y, velocity_2.x, velocity_2.y)
+            return out
         return [self.pogo_body.angle,   self.pogo_body.angular_velocity,   self.pogo_body.position[0],   self.pogo_body.position[1],   self.pogo_body.velocity[0],   self.pogo_body.velocity[1],
                 self.pogo_body_2.angle, self.pogo_body_2.angular_velocity, self.pogo_body_2.position[0], self.pogo_body_2.position[1], self.pogo_body_2.velocity[0], self.pogo_body_2.velocity[1]]
 
@@ -32,15 +63,11 @@ class Pogo:
     def apply_actions(self, actions):
         #jump
         if actions[0] == 1:
-            if time.time() - self.press_time >= 0.2:
+            if self.sim_time - self.press_time >= 0.2:
                 self.jump_pressed = True
-                self.press_time = time.time()
+                self.press_time = self.sim_time
                 self.jumping_spring.rest_length += self.spring_jump_distance  # Increase the rest length by 50 units
-
-        # Check if the spring length should revert after 0.1 seconds
-        if self.jump_pressed and time.time() - self.press_time >= .1:
-            self.jumping_spring.rest_length = self.jumping_spring_rest_length  # Revert to the original length
-            self.jump_pressed = False
+        self.release_jump()
         
         #top spring right, left, and center
         if actions[1] == 1:
@@ -58,8 +85,64 @@ class Pogo:
         else:
             self.bottom_spring.rest_length = self.bottom_spring_rest_length
     
-    """Resets the simulation by re-creating all of the bodies and resetting their positions."""
+    """Reverts the jumping spring once the jump has been held for 0.1 seconds"""
+    def release_jump(self):
+        if self.jump_pressed and self.sim_time - self.press_time >= .1:
+            self.jumping_spring.rest_length = self.jumping_spring_rest_length  # Revert to the original length
+            self.jump_pressed = False
+
+    """Adds the same velocity (x, y) to every body of the pogo, for example to start an episode with a small push"""
+    def push(self, velocity):
+        for body in (self.pogo_body, self.pogo_body_2, self.jumping_spring.b):
+            body.velocity += tuple(velocity)
+
+    """Returns everything needed to put the pogo back into its current state with restore: the simulated clock, the jump, the rest
+    lengths of the springs, and the position, velocity, angle and angular velocity of every body"""
+    def snapshot(self):
+        bodies = []
+        for body in (self.pogo_body, self.pogo_body_2, self.jumping_spring.b):
+            bodies.append((tuple(body.position), tuple(body.velocity), body.angle, body.angular_velocity))
+        rest_lengths = (self.top_spring.rest_length, self.bottom_spring.rest_length, self.jumping_spring.rest_length)
+        return {'steps': self.steps, 'jump_pressed': self.jump_pressed, 'press_time': self.press_time, 'rest_lengths': rest_lengths,
+                'bodies': bodies}
+
+    """Puts the pogo back into a state returned by snapshot, for example to run several episodes from the same mid-run state. The space
+    is not rebuilt: the bodies are moved back in place and taken out of the space and added again (see refill_space), which clears the
+    contact information Pymunk keeps between steps. Every restore of a snapshot gives the same results whatever ran in the space before,
+    so forks of a snapshot match each other bit for bit. They do not match continuing the run the snapshot was taken from, as its contact
+    information is not part of the snapshot (Pymunk cannot put it back exactly, not even by copying the space): replaying the same actions,
+    a fork was measured to be about 1 to 3 pixels off that run after a second, and up to about 20 pixels off within 5 seconds"""
+    def restore(self, snapshot):
+        self.steps = snapshot['steps']
+        self.jump_pressed = snapshot['jump_pressed']
+        self.press_time = snapshot['press_time']
+        self.top_spring.rest_length, self.bottom_spring.rest_length, self.jumping_spring.rest_length = snapshot['rest_lengths']
+        for body, (position, velocity, angle, angular_velocity) in zip((self.pogo_body, self.pogo_body_2, self.jumping_spring.b),
+                                                                        snapshot['bodies']):
+            pymunk.Body.update_position(body, 0) # clears the bias velocity Pymunk keeps from the last step, without moving the body
+            body.position = position
+            body.velocity = velocity
+            body.angle = angle
+            body.angular_velocity = angular_velocity
+        refill_space(self.space, *self.template)
+
+    """Resets the simulation by putting every body back to where it started (see restore). The simulated clock starts again at 0, and
+    the pogo moves bit for bit the same as a newly created one"""
     def reset_simulation(self):
+        self.restore(self.initial_state)
+
+    """Creates the Pymunk physics space and a single pogo in it, and keeps what reset_simulation puts back. Only called once"""
+    def create_simulation(self):
+        self.steps = 0
+        self.jump_pressed = False
+        self.press_time = -1 # long enough ago that the agent can jump right away
+        self.space = self.create_space()
+        self.pogo_body, self.pogo_body_2, self.top_spring, self.bottom_spring, self.jumping_spring = self.create_rig(self.space)
+        self.template = space_template(self.space)
+        self.initial_state = self.snapshot()
+
+    """Creates the Pymunk physics space with gravity and the static ground at the bottom. Every ground shape gets ground_filter"""
+    def create_space(self, ground_filter=pymunk.ShapeFilter()):
         # Create the Pymunk physics space and gravity
         space = pymunk.Space()
         space.gravity = (0, 900) 
@@ -67,8 +150,13 @@ class Pogo:
         # Create static ground at the bottom
         ground = pymunk.Segment(space.static_body, (-500, 550), (1700, 550), 5)  # Ground line at y = 550
         ground.friction = 1
+        ground.filter = ground_filter
         space.add(ground)
+        return space
 
+    """Creates the bodies, shapes and springs of a single pogo and adds them to the space. Every shape of the pogo gets shape_filter,
+    which decides what the pogo is able to collide with. Returns the bodies and springs used by get_current_state and apply_actions"""
+    def create_rig(self, space, shape_filter=pymunk.ShapeFilter()):
         """Create a single body for the pogostics"""
         mass = 2
         width = 25
@@ -89,6 +177,7 @@ class Pogo:
         pogo_box1_shape = pymunk.Poly(pogo_body, box1_vertices)
         pogo_box1_shape.elasticity = 0.5
         pogo_box1_shape.friction = 1
+        pogo_box1_shape.filter = shape_filter
         space.add(pogo_box1_shape)
 
         # Box 2 (horizontal base of the U)
@@ -101,6 +190,7 @@ class Pogo:
         pogo_box2_shape = pymunk.Poly(pogo_body, box2_vertices)
         pogo_box2_shape.elasticity = 0.5
         pogo_box2_shape.friction = 1
+        pogo_box2_shape.filter = shape_filter
         space.add(pogo_box2_shape)
 
         # Box 3 (right vertical part of the U)
@@ -113,6 +203,7 @@ class Pogo:
         pogo_box3_shape = pymunk.Poly(pogo_body, box3_vertices)
         pogo_box3_shape.elasticity = 0.5
         pogo_box3_shape.friction = 1
+        pogo_box3_shape.filter = shape_filter
         space.add(pogo_box3_shape)
 
         # Box 4 (left foot holder)
@@ -125,6 +216,7 @@ class Pogo:
         pogo_box4_shape = pymunk.Poly(pogo_body, box4_vertices)
         pogo_box4_shape.elasticity = 0.5
         pogo_box4_shape.friction = 1
+        pogo_box4_shape.filter = shape_filter
         space.add(pogo_box4_shape)
 
         # Box 5 (right foot holder)
@@ -137,6 +229,7 @@ class Pogo:
         pogo_box5_shape = pymunk.Poly(pogo_body, box5_vertices)
         pogo_box5_shape.elasticity = 0.5
         pogo_box5_shape.friction = 1
+        pogo_box5_shape.filter = shape_filter
         space.add(pogo_box5_shape)
 
 
@@ -157,6 +250,7 @@ class Pogo:
         pogo_box1_shape_2 = pymunk.Poly(pogo_body_2, box1_vertices_2)
         pogo_box1_shape_2.elasticity = 0.5
         pogo_box1_shape_2.friction = 0.5
+        pogo_box1_shape_2.filter = shape_filter
         space.add(pogo_box1_shape_2)
 
         # Box 2 (left right of the U)
@@ -169,6 +263,7 @@ class Pogo:
         pogo_box2_shape_2 = pymunk.Poly(pogo_body_2, box2_vertices_2)
         pogo_box2_shape_2.elasticity = 0.5
         pogo_box2_shape_2.friction = 0.5
+        pogo_box2_shape_2.filter = shape_filter
         space.add(pogo_box2_shape_2)
 
         # Box 3 (top part of the U)
@@ -181,6 +276,7 @@ class Pogo:
         pogo_box3_shape_2 = pymunk.Poly(pogo_body_2, box2_vertices_3)
         pogo_box3_shape_2.elasticity = 0.5
         pogo_box3_shape_2.friction = 0.5
+        pogo_box3_shape_2.filter = shape_filter
         space.add(pogo_box3_shape_2)
 
 
@@ -231,6 +327,7 @@ class Pogo:
         jumping_box_shape = pymunk.Poly.create_box(jumping_box_body, box_size)
         jumping_box_shape.elasticity = 0.5
         jumping_box_shape.friction = 1
+        jumping_box_shape.filter = shape_filter
         space.add(jumping_box_shape)
 
         #Create a spring between the U-shaped body and the separate box body
@@ -247,10 +344,172 @@ class Pogo:
         )
         space.add(jumping_spring)
 
-        #set global variables that are used in get_current_state
-        self.pogo_body = pogo_body
-        self.pogo_body_2 = pogo_body_2
-        self.top_spring = top_spring
-        self.bottom_spring = bottom_spring
-        self.jumping_spring = jumping_spring
-        self.space = space
\ No newline at end of file
+        return pogo_body, pogo_body_2, top_spring, bottom_spring, jumping_spring
+
+
+class MultiPogo(Pogo):
+    """Simulates num_agents pogos at the same time, one for every agent of a population. The state and actions of all the pogos are numpy
+    arrays with one row per pogo. Pogos can share a space: each pogo in a space gets its own collision category and only collides with the
+    ground and with itself, so the pogos go through each other but every pogo moves like it would on its own. By default every pogo still
+    gets a space of its own (pogos_per_space=1): that is the only way the pogos move bit for bit like a Pogo, so run_generation gives the
+    same results as run_episode, and putting the pogos in one space was measured not to be any faster, as nearly all the time of a crowded
+    space goes into finding the collisions between overlapping pogos that are then filtered out"""
+
+    """pogos_per_space is how many pogos share a space, from 1 to 31 as there are only 31 collision categories besides the ground. With 1,
+    every pogo moves bit for bit the same as a Pogo. In a shared space the order the contacts are solved in depends on the other pogos,
+    and the pogo is chaotic enough that this changes whole episodes: with 10 pogos per space the fitness of an agent was measured to be
+    up to about 270 off from that of a Pogo. Since the pogos all overlap, a crowded space also spends more time finding collisions that
+    are then filtered out"""
+    def __init__(self, num_agents, pogos_per_space=1, time_step=1 / 60.0, action_repeat=1):
+        if not 1 <= pogos_per_space <= 31:
+            raise ValueError(f"pogos_per_space has to be from 1 to 31, not {pogos_per_space}")
+        self.num_agents = num_agents
+        self.pogos_per_space = pogos_per_space
+        super().__init__(time_step, action_repeat)
+
+    """Steps every space forward by the given number of time steps and advances the simulated clock, releasing jumps like step of Pogo"""
+    def step(self, steps=1):
+        for i in range(steps):
+            self.release_jump()
+            for space in self.spaces:
+                space.step(self.time_step)
+            self.steps += 1
+
+    """Returns a (num_agents, 12) array where each row is the state get_current_state of Pogo would give for that pogo. The rows of
+    pogos that have been removed keep their last state. If out is given, the states are written into it instead and it is returned"""
+    def get_current_state(self, out=None):
+        state = self.state if out is None else out
+        for i in np.flatnonzero(self.active):
+            pogo_body = self.pogo_bodies[i]
+            pogo_body_2 = self.pogo_bodies_2[i]
+            position, velocity = pogo_body.position, pogo_body.velocity
+            position_2, velocity_2 = pogo_body_2.position, pogo_body_2.velocity
+            state[i] = (pogo_body.angle,   pogo_body.angular_velocity,   position.x,   position.y,   velocity.x,   velocity.y,
+                        pogo_body_2.angle, pogo_body_2.angular_velocity, position_2.x, position_2.y, velocity_2.x, velocity_2.y)
+        return state
+
+    """Takes a (num_agents, 5) array of actions, one row per pogo, and applies them like apply_actions of Pogo does. Pogos that have
+    been removed are skipped"""
+    def apply_actions(self, actions):
+        actions = np.asarray(actions)
+
+        #jump, and revert the jumps that were pressed at least 0.1 seconds ago
+        jump = self.active & (actions[:, 0] == 1) & (self.sim_time - self.press_time >= 0.2)
+        self.jump_pressed |= jump
+        self.press_time[jump] = self.sim_time
+        for i in np.flatnonzero(jump):
+            self.jumping_springs[i].rest_length += self.spring_jump_distance
+        self.release_jump()
+
+        #top spring right, left, and center, and bottom spring right, left, and center
+        top_rest_lengths = np.where(actions[:, 1] == 1, 20, np.where(actions[:, 2] == 1, -20, 0)) + self.top_spring_rest_length
+        bottom_rest_lengths = np.where(actions[:, 3] == 1, -20, np.where(actions[:, 4] == 1, 20, 0)) + self.bottom_spring_rest_length
+        for i in np.flatnonzero(self.active):
+            self.top_springs[i].rest_length = float(top_rest_lengths[i])
+            self.bottom_springs[i].rest_length = float(bottom_rest_lengths[i])
+
+    """Reverts the jumping spring of every pogo whose jump has been held for 0.1 seconds"""
+    def release_jump(self):
+        if not self.jump_pressed.any():
+            return
+        revert = self.active & self.jump_pressed & (self.sim_time - self.press_time >= .1)
+        self.jump_pressed &= ~revert
+        for i in np.flatnonzero(revert):
+            self.jumping_springs[i].rest_length = self.jumping_spring_rest_length
+
+    """Takes a (num_agents, 2) array of velocities and pushes each pogo like push of Pogo does. Pogos that have been removed are skipped"""
+    def push(self, velocities):
+        for i in np.flatnonzero(self.active):
+            for body in (self.pogo_bodies[i], self.pogo_bodies_2[i], self.jumping_springs[i].b):
+                body.velocity += tuple(velocities[i])
+
+    """Returns everything needed to put every pogo back into its current state with restore, like snapshot of Pogo: the simulated clock,
+    which pogos are still in the simulation, their jumps, the rest lengths of their springs, and the position, velocity, angle and angular
+    velocity of every body of every pogo"""
+    def snapshot(self):
+        bodies = []
+        for i in range(self.num_agents):
+            for body in (self.pogo_bodies[i], self.pogo_bodies_2[i], self.jumping_springs[i].b):
+                bodies.append((tuple(body.position), tuple(body.velocity), body.angle, body.angular_velocity))
+        rest_lengths = [(self.top_springs[i].rest_length, self.bottom_springs[i].rest_length, self.jumping_springs[i].rest_length)
+                        for i in range(self.num_agents)]
+        return {'steps': self.steps, 'active': self.active.copy(), 'jump_pressed': self.jump_pressed.copy(),
+                'press_time': self.press_time.copy(), 'rest_lengths': rest_lengths, 'bodies': bodies}
+
+    """Puts every pogo back into a state returned by snapshot, in place like restore of Pogo does, and removes the pogos that had been
+    removed again"""
+    def restore(self, snapshot):
+        self.steps = snapshot['steps']
+        self.active = np.ones(self.num_agents, dtype=bool)
+        self.jump_pressed = snapshot['jump_pressed'].copy()
+        self.press_time = snapshot['press_time'].copy()
+        self.state = np.zeros((self.num_agents, 12))
+        for i in range(self.num_agents):
+            self.top_springs[i].rest_length, self.bottom_springs[i].rest_length, self.jumping_springs[i].rest_length = snapshot['rest_lengths'][i]
+            for j, body in enumerate((self.pogo_bodies[i], self.pogo_bodies_2[i], self.jumping_springs[i].b)):
+                pymunk.Body.update_position(body, 0)
+                body.position, body.velocity, body.angle, body.angular_velocity = snapshot['bodies'][3 * i + j]
+        for space, template in zip(self.spaces, self.templates):
+            refill_space(space, *template)
+        for i in np.flatnonzero(~snapshot['active']):
+            self.remove_agent(i)
+
+    """Takes the pogo of agent i out of its space, for example once its episode is over, so that it no longer costs any time to step"""
+    def remove_agent(self, i):
+        if not self.active[i]:
+            return
+        self.active[i] = False
+        self.spaces[i // self.pogos_per_space].remove(*self.parts[i])
+
+    """Creates every space and pogo, and keeps what reset_simulation puts back. Only called once"""
+    def create_simulation(self):
+        self.steps = 0
+        self.jump_pressed = np.zeros(self.num_agents, dtype=bool)
+        self.press_time = np.full(self.num_agents, -1.0) # long enough ago that the agents can jump right away
+        self.active = np.ones(self.num_agents, dtype=bool)
+
+        self.spaces = []
+        self.pogo_bodies = []
+        self.pogo_bodies_2 = []
+        self.top_springs = []
+        self.bottom_springs = []
+        self.jumping_springs = []
+        for i in range(self.num_agents):
+            category = i % self.pogos_per_space + 1 # category 0 is the ground
+            if category == 1:
+                self.spaces.append(self.create_space(pymunk.ShapeFilter(categories=1)))
+            shape_filter = pymunk.ShapeFilter(categories=1 << category, mask=1 | 1 << category)
+            pogo_body, pogo_body_2, top_spring, bottom_spring, jumping_spring = self.create_rig(self.spaces[-1], shape_filter)
+            self.pogo_bodies.append(pogo_body)
+            self.pogo_bodies_2.append(pogo_body_2)
+            self.top_springs.append(top_spring)
+            self.bottom_springs.append(bottom_spring)
+            self.jumping_springs.append(jumping_spring)
+        self.templates = [space_template(space) for space in self.spaces]
+
+        # the bodies, shapes and springs of every pogo in the order they were added, so that removing pogos from a shared space always
+        # leaves the others in the same order (the bodies only keep their shapes and springs in sets)
+        self.parts = []
+        for i in range(self.num_agents):
+            bodies, shapes, constraints, first_shape_id = self.templates[i // self.pogos_per_space]
+            own = (self.pogo_bodies[i], self.pogo_bodies_2[i], self.jumping_springs[i].b)
+            self.parts.append([body for body in bodies if body in own] + [shape for shape in shapes if shape.body in own] +
+                              [constraint for constraint in constraints if constraint.a in own])
+        self.initial_state = self.snapshot()
+
+
+"""Returns what refill_space needs to put everything in space but the ground back: its bodies, shapes and constraints in the order they
+were added, and the id Pymunk gave its first shape"""
+def space_template(space):
+    shapes = [shape for shape in space.shapes if shape.body is not space.static_body]
+    return list(space.bodies), shapes, list(space.constraints), lib.cpSpaceGetShapeIDCounter(space._space) - len(shapes)
+
+"""Takes everything but the ground out of space and adds the bodies, shapes and constraints of a template (see space_template) back in,
+which clears the contact information Pymunk keeps between steps. The shapes get back the ids they were first given, as the order Pymunk
+finds collisions in depends on them, so a refilled space steps bit for bit the same as a new one with its bodies where they are now.
+Pymunk has no public way to set the ids, so the counter is set through its Chipmunk library, like Pymunk does itself when it
+unpickles a space (see the version check at the top)"""
+def refill_space(space, bodies, shapes, constraints, first_shape_id):
+    space.remove(*space.bodies, *[shape for shape in space.shapes if shape.body is not space.static_body], *space.constraints)
+    lib.cpSpaceSetShapeIDCounter(space._space, first_shape_id)
+    space.add(*bodies, *shapes, *constraints)
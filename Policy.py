@@ -0,0 +1,86 @@
+# This file runs a trained neural network without the rest of the project. export_policy turns a NeuralNetwork into a small file of float32
+# (or float16) weights, and Policy loads it in a couple of milliseconds with nothing but numpy and gives the same actions calculate_forward
+# does. The layers are rewritten so that less work is done per step: a network adds each bias after the tanh, so the bias of a layer is
+# folded into the next layer (tanh(x) + b times W is tanh(x) W + b W), and the tanh of the last layer is left out by comparing against the
+# value it would need to reach instead (tanh(z) + b >= 0 is z >= arctanh(-b)). Every array a step needs is made when the policy is loaded,
+# so calculating forward allocates nothing. Run export_policy.py to export an agent and measure how closely the policy follows it.
+#
+# Jacob Karty 12/8/2024
+
+import json
+import os
+import numpy as np
+
+policy_magic = b'POGOPOL1'
+
+"""Writes network (a NeuralNetwork, or anything with its inputs, weights and biases) to path as a policy. dtype is 'float32' or 'float16',
+the type the weights are stored as. Any keyword arguments are stored in the file as metadata"""
+def export_policy(network, path, dtype='float32', **metadata):
+    weights = [np.asarray(weight, dtype=float) for weight in network.weights]
+    biases = [np.asarray(bias, dtype=float).reshape(-1) for bias in network.biases]
+
+    # fold the bias of every layer into the next layer, and turn the last bias into the value the last layer is compared against
+    arrays = []
+    for i, weight in enumerate(weights):
+        arrays += [weight, biases[i-1] @ weight if i > 0 else np.zeros(weight.shape[1])]
+    with np.errstate(divide='ignore'):
+        arrays.append(np.arctanh(np.clip(-biases[-1], -1, 1)))
+
+    header = json.dumps({'layers': list(network.inputs), 'dtype': dtype, 'metadata': metadata},
+                        default=lambda value: value.tolist()).encode()
+    start = len(policy_magic) + 4 + len(header)
+    header += b' ' * (-start % 64) # start the weights at a multiple of 64 bytes
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as file:
+        file.write(policy_magic)
+        file.write(len(header).to_bytes(4, 'little'))
+        file.write(header)
+        for array in arrays:
+            file.write(array.astype(np.dtype(dtype).newbyteorder('<')).tobytes())
+
+
+class Policy:
+    """Loads a policy written by export_policy. The weights are used as float32 whatever type they were stored as"""
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            data = file.read()
+        if data[:len(policy_magic)] != policy_magic:
+            raise ValueError(f"{path} is not an exported policy")
+        header_length = int.from_bytes(data[len(policy_magic):len(policy_magic) + 4], 'little')
+        header = json.loads(data[len(policy_magic) + 4:len(policy_magic) + 4 + header_length])
+        self.inputs = header['layers']
+        self.metadata = header['metadata']
+
+        stored = np.frombuffer(data, dtype=np.dtype(header['dtype']).newbyteorder('<'), offset=len(policy_magic) + 4 + header_length)
+        values = stored.astype(np.float32) # a single copy, which also makes the weights writable and aligned
+        self.weights = []
+        self.offsets = [] # the folded biases
+        start = 0
+        for i in range(len(self.inputs) - 1):
+            size = self.inputs[i] * self.inputs[i+1]
+            self.weights.append(values[start:start + size].reshape(self.inputs[i], self.inputs[i+1]))
+            self.offsets.append(values[start + size:start + size + self.inputs[i+1]])
+            start += size + self.inputs[i+1]
+        self.thresholds = values[start:]
+
+        # the value of every layer, the buttons pressed and the actions, reused by every call
+        self.values = [np.zeros(size, dtype=np.float32) for size in self.inputs]
+        self.pressed = np.zeros(self.inputs[-1], dtype=bool)
+        self.actions = np.zeros(self.inputs[-1], dtype=np.int64)
+
+    """Takes a single state and returns the actions (1s and -1s) calculate_forward of the exported network gives for it. The returned array
+    is reused by the next call, so copy it to keep it"""
+    def calculate_forward(self, value):
+        values = self.values
+        np.copyto(values[0], value)
+        last = len(self.weights) - 1
+        for i in range(last + 1):
+            np.dot(values[i], self.weights[i], out=values[i+1])
+            values[i+1] += self.offsets[i]
+            if i < last:
+                np.tanh(values[i+1], out=values[i+1])
+        np.greater_equal(values[-1], self.thresholds, out=self.pressed)
+        np.multiply(self.pressed, 2, out=self.actions)
+        self.actions -= 1
+        return self.actions
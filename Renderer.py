@@ -0,0 +1,42 @@
+# This is a small wrapper around the pygame window used to watch the pogo. Training can run without one of these at all, in which case
+# nothing is drawn and the simulation is not capped to real time.
+#
+# Jacob Karty 12/3/2024
+
+import pygame
+import pymunk.pygame_util
+
+class Renderer:
+    """Opens the pygame window. fps is the frame cap used when drawing, so that the pogo moves at real time speed."""
+    def __init__(self, fps=60):
+        pygame.init()
+        self.screen = pygame.display.set_mode((1200, 600))
+        self.clock = pygame.time.Clock()
+        self.draw_options = pymunk.pygame_util.DrawOptions(self.screen)
+        self.fps = fps
+        self.running = True
+
+    """Draws a single frame of one or more spaces on top of each other and waits for the frame cap. Returns False once the x of the window
+    has been pressed. If metrics is given, the time spent polling the events, drawing and waiting for the frame cap is added to it"""
+    def draw(self, *spaces, metrics=None):
+        if metrics is not None:
+            metrics.mark()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.running = False
+        if metrics is not None:
+            metrics.lap('events')
+        self.screen.fill((255, 255, 255))
+        for space in spaces:
+            space.debug_draw(self.draw_options)
+        pygame.display.flip()
+        if metrics is not None:
+            metrics.lap('render')
+        self.clock.tick(self.fps)
+        if metrics is not None:
+            metrics.lap('frame_wait')
+        return self.running
+
+    """Closes the window"""
+    def close(self):
+        pygame.quit()
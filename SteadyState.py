@@ -0,0 +1,108 @@
+# This file holds steady state evolution, where there are no generations. A population of evaluated agents is kept, and whenever a worker
+# is free it gets a new child of two agents out of the top 20%. As soon as the result of a child comes back, the child takes the place of the
+# worst agent if it did at least as well. Nothing waits for the slowest episode of a generation, so the workers stay busy however much the
+# lengths of the episodes vary (an agent that falls over is done after half a second, a good one runs the full 10 seconds).
+#
+# Jacob Karty 12/10/2024
+
+from NeuralNet import NeuralNetwork, save_population, load_population
+from Trainer import child_rng
+import json
+import os
+import numpy as np
+
+class SteadyState:
+    """Keeps population_size evaluated agents. Children are made with make_child of NeuralNetwork with mutation_rate, and seed is the seed
+    of the run the random number generator of every child comes from"""
+    def __init__(self, population_size, mutation_rate=0.1, seed=None):
+        self.population_size = population_size
+        self.mutation_rate = mutation_rate
+        self.seed = seed
+        self.population = [] # the agents that have been evaluated, fewer than population_size at the start
+        self.distances = []
+        self.fitnesses = []
+        self.children_made = 0
+        self.evaluations = 0
+        self.best_agent = None # None until the first agent has been evaluated
+        self.best_distance = 0
+        self.best_fitness = None # the fitness of the best agent
+
+    """Whether population_size agents have been evaluated"""
+    def full(self):
+        return len(self.population) >= self.population_size
+
+    """The fitness a child has to reach to get into the population, which steady_state.py can also give its episode up at (see run_episode)"""
+    def worst(self):
+        return min(self.fitnesses) if self.full() else -np.inf
+
+    """Makes a child of two different agents picked at random out of the top 20% of the population. Needs at least 2 evaluated agents"""
+    def make_child(self):
+        rng = child_rng(self.seed, self.children_made)
+        self.children_made += 1
+        top = np.argsort(self.fitnesses)[::-1][:max(2, len(self.population) // 5)]
+        first, second = rng.choice(top, 2, replace=False)
+        return self.population[first].make_child(self.population[second], self.mutation_rate, rng)
+
+    """Takes the result of an agent. Until the population is full every agent joins it, after that the agent takes the place of the worst
+    agent if it did at least as well. Returns whether the agent joined the population"""
+    def add(self, agent, distance, fitness):
+        self.evaluations += 1
+        if self.best_agent is None or distance > self.best_distance:
+            self.best_agent = agent
+            self.best_distance = distance
+            self.best_fitness = fitness
+        if not self.full():
+            index = len(self.population)
+            self.population.append(None)
+            self.distances.append(None)
+            self.fitnesses.append(None)
+        else:
+            index = int(np.argmin(self.fitnesses))
+            if fitness < self.fitnesses[index]:
+                return False
+        self.population[index] = agent
+        self.distances[index] = float(distance)
+        self.fitnesses[index] = float(fitness)
+        return True
+
+    """Saves the population and its results to run_dir, in the same way a Trainer saves a run"""
+    def save(self, run_dir):
+        os.makedirs(run_dir, exist_ok=True)
+        population_file = f'evaluation_{self.evaluations}.pogo'
+        save_population(os.path.join(run_dir, population_file), self.population, distances=self.distances, fitnesses=self.fitnesses,
+                        mutation_rate=self.mutation_rate)
+        if self.best_agent is not None:
+            self.best_agent.save(os.path.join(run_dir, 'best_agent.tmp'), evaluations=self.evaluations, distance=float(self.best_distance),
+                                 fitness=float(self.best_fitness), mutation_rate=self.mutation_rate)
+            os.replace(os.path.join(run_dir, 'best_agent.tmp'), os.path.join(run_dir, 'best_agent.pogo'))
+
+        state = {'population_file': population_file, 'population_size': self.population_size, 'mutation_rate': self.mutation_rate,
+                 'seed': self.seed, 'children_made': self.children_made, 'evaluations': self.evaluations,
+                 'best_distance': float(self.best_distance),
+                 'best_fitness': None if self.best_fitness is None else float(self.best_fitness)}
+        with open(os.path.join(run_dir, 'state.tmp'), 'w') as file:
+            json.dump(state, file)
+        previous = None
+        if os.path.exists(os.path.join(run_dir, 'state.json')):
+            with open(os.path.join(run_dir, 'state.json')) as file:
+                previous = json.load(file)['population_file']
+        os.replace(os.path.join(run_dir, 'state.tmp'), os.path.join(run_dir, 'state.json'))
+        if previous is not None and previous != population_file: # no longer needed once state.json points at the new file
+            os.remove(os.path.join(run_dir, previous))
+
+    """Loads a steady state run saved in run_dir"""
+    @staticmethod
+    def load(run_dir):
+        with open(os.path.join(run_dir, 'state.json')) as file:
+            state = json.load(file)
+        evolution = SteadyState(state['population_size'], state['mutation_rate'], state['seed'])
+        evolution.population, metadata = load_population(os.path.join(run_dir, state['population_file']), copy=True)
+        evolution.distances = metadata['distances']
+        evolution.fitnesses = metadata['fitnesses']
+        evolution.children_made = state['children_made']
+        evolution.evaluations = state['evaluations']
+        evolution.best_distance = state['best_distance']
+        evolution.best_fitness = state['best_fitness']
+        if os.path.exists(os.path.join(run_dir, 'best_agent.pogo')):
+            evolution.best_agent = NeuralNetwork.load(os.path.join(run_dir, 'best_agent.pogo'), copy=True)
+        return evolution
@@ -0,0 +1,141 @@
+# This file holds the evolution strategies, which decide how the next generation is made out of the current one and how well each agent
+# did. Every strategy has the same methods, so the Trainer can run any of them:
+#   next_generation(population, fitnesses, rng) returns the agents of the next generation, drawing all its random numbers from rng
+#   kept(population_size) is how many of the best agents are carried over unchanged into the next generation
+#   get_state() returns a json dictionary with everything needed to recreate the strategy with load_strategy
+# The strategies work on the flat genomes of the agents (see NeuralNet.py), so a whole generation is made with a few matrix operations.
+#
+# Jacob Karty 12/6/2024
+
+from NeuralNet import NeuralNetwork, make_children
+import numpy as np
+
+class TopFifth:
+    """The original scheme described in the README. The top 20% of the population reproduce, the better ones more often (see
+    generate_weighted_reproduction_matrix), with uniform crossover and mutation. With elitism the top 20% are also kept, and with annealing
+    the mutation rate is lowered by annealing_step_size every generation, down to annealing_min"""
+    name = 'top_fifth'
+
+    def __init__(self, mutation_rate=0.1, elitism=True, annealing=True, annealing_step_size=0.001, annealing_min=.01):
+        self.mutation_rate = mutation_rate
+        self.elitism = elitism
+        self.annealing = annealing
+        self.annealing_step_size = annealing_step_size
+        self.annealing_min = annealing_min
+
+    """Makes the next generation out of the top 20% of the population, and cools off the mutation rate"""
+    def next_generation(self, population, fitnesses, rng):
+        population_size = len(population)
+        num_top_agents = population_size//5
+
+        #sort by the best agents, and keep the top 20% of population in the next generation with elitism
+        top_indices = np.argsort(fitnesses)[::-1]
+        children = [population[i] for i in top_indices[:self.kept(population_size)]]
+
+        #determine which agents reproduce with which other agents and how many times
+        reproduction_matrix = NeuralNetwork.generate_weighted_reproduction_matrix(num_top_agents, population_size - len(children))
+        first, second = np.nonzero(reproduction_matrix)
+        counts = reproduction_matrix[first, second]
+
+        #make all the children at once out of the genomes of the population
+        genomes = np.stack([agent.genome for agent in population])
+        child_genomes = make_children(genomes, np.repeat(top_indices[first], counts), np.repeat(top_indices[second], counts),
+                                      self.mutation_rate, rng)
+        children += [NeuralNetwork(population[0].inputs, genome) for genome in child_genomes]
+
+        #annealing - cool off the mutation rate slowly
+        if self.annealing:
+            self.mutation_rate -= self.annealing_step_size
+        if self.mutation_rate < self.annealing_min:
+            self.mutation_rate = self.annealing_min
+        return children
+
+    """The top 20% are kept with elitism"""
+    def kept(self, population_size):
+        return population_size//5 if self.elitism else 0
+
+    def get_state(self):
+        return {'name': self.name, 'mutation_rate': self.mutation_rate, 'elitism': self.elitism, 'annealing': self.annealing,
+                'annealing_step_size': self.annealing_step_size, 'annealing_min': self.annealing_min}
+
+
+class Tournament:
+    """Tournament selection. Each parent of a child is the best of tournament_size agents picked at random, so every agent has a chance to
+    reproduce but the better ones win more often. The children are made with uniform crossover and mutation like TopFifth, and the best
+    elites agents are kept unchanged"""
+    name = 'tournament'
+
+    def __init__(self, mutation_rate=0.1, tournament_size=3, elites=1):
+        self.mutation_rate = mutation_rate
+        self.tournament_size = tournament_size
+        self.elites = elites
+
+    """Keeps the best agents, and makes the rest of the next generation with a pair of tournaments per child"""
+    def next_generation(self, population, fitnesses, rng):
+        fitnesses = np.asarray(fitnesses)
+        children = [population[i] for i in np.argsort(fitnesses)[::-1][:self.kept(len(population))]]
+
+        # every row of contestants is a tournament, the first half picks the first parents and the second half the second parents
+        num_children = len(population) - len(children)
+        contestants = rng.integers(len(population), size=(2 * num_children, self.tournament_size))
+        winners = contestants[np.arange(len(contestants)), np.argmax(fitnesses[contestants], axis=1)]
+
+        genomes = np.stack([agent.genome for agent in population])
+        child_genomes = make_children(genomes, winners[:num_children], winners[num_children:], self.mutation_rate, rng)
+        return children + [NeuralNetwork(population[0].inputs, genome) for genome in child_genomes]
+
+    def kept(self, population_size):
+        return min(self.elites, population_size)
+
+    def get_state(self):
+        return {'name': self.name, 'mutation_rate': self.mutation_rate, 'tournament_size': self.tournament_size, 'elites': self.elites}
+
+
+class EvolutionStrategy:
+    """A natural evolution strategy in the style of OpenAI's ES. Instead of a population of parents, it keeps a single mean genome, and
+    every generation is the mean plus sigma times gaussian noise, in mirrored pairs (mean + noise and mean - noise). The fitnesses are
+    turned into ranks, so a single lucky episode cannot throw the mean off, and the mean takes a learning_rate step in the direction of the
+    noise weighted by the ranks, which estimates the direction that raises the fitness. weight_decay pulls the mean slightly towards 0 to
+    keep the weights from growing. The mean starts at the best agent of the first generation"""
+    name = 'es'
+
+    def __init__(self, sigma=0.05, learning_rate=0.03, weight_decay=0.005, mean=None):
+        self.sigma = sigma
+        self.learning_rate = learning_rate
+        self.weight_decay = weight_decay
+        self.mean = None if mean is None else np.asarray(mean, dtype=float)
+
+    """Moves the mean in the direction the ranks of the population point to, then samples the next generation around it"""
+    def next_generation(self, population, fitnesses, rng):
+        genomes = np.stack([agent.genome for agent in population])
+        if self.mean is None:
+            self.mean = genomes[np.argmax(fitnesses)].copy()
+        else:
+            # the noise each agent was made with, and its rank scaled to between -0.5 and 0.5
+            noise = genomes - self.mean
+            noise /= self.sigma
+            ranks = np.argsort(np.argsort(fitnesses)) / max(len(population) - 1, 1) - 0.5
+            gradient = ranks @ noise / (len(population) * self.sigma)
+            self.mean += self.learning_rate * gradient - self.weight_decay * self.mean
+
+        noise = rng.standard_normal(((len(population) + 1) // 2, len(self.mean)))
+        child_genomes = np.concatenate([noise, -noise])[:len(population)]
+        child_genomes *= self.sigma
+        child_genomes += self.mean
+        return [NeuralNetwork(population[0].inputs, genome) for genome in child_genomes]
+
+    """No agent is kept, every generation is sampled from the mean"""
+    def kept(self, population_size):
+        return 0
+
+    def get_state(self):
+        return {'name': self.name, 'sigma': self.sigma, 'learning_rate': self.learning_rate, 'weight_decay': self.weight_decay,
+                'mean': None if self.mean is None else self.mean.tolist()}
+
+
+strategies = {strategy.name: strategy for strategy in (TopFifth, Tournament, EvolutionStrategy)}
+
+"""Creates the strategy a dictionary returned by get_state describes"""
+def load_strategy(state):
+    state = dict(state)
+    return strategies[state.pop('name')](**state)
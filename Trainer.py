@@ -0,0 +1,188 @@
+# This file keeps track of a training run: the population, the evolution strategy, the metrics of every generation and the seed of the run.
+# After every generation the whole run is saved to a run directory, so that training can be resumed from the exact generation it left off
+# at if it crashes, the window is closed, or the machine it runs on goes away.
+#
+# Every random number of a run comes from the seed of the run. Rather than drawing everything from a single generator one after another,
+# each agent of the first generation, the children of each later generation, the pushes of the episodes, each child of a steady state run
+# and the seed of each island get their own random number generator, which only depends on the seed and on which one it is. So two runs
+# with the same seed create exactly the same populations, no matter in which order the agents are evaluated. The first number of the
+# spawn key tells the kinds apart. 1 was the generator of each worker process, which episodes never needed, and is left unused so that a
+# seed keeps giving the same run.
+#
+# Jacob Karty 12/3/2024
+
+from NeuralNet import save_population, load_population
+from Strategies import TopFifth, load_strategy
+from Metrics import Metrics
+import numpy as np
+import json
+import os
+import time
+
+distance_threshold = 500 # the distance the best agents reach, used to compare how many episodes strategies take to get there
+
+class Trainer:
+    """population is the list of agents in the first generation, and strategy is the evolution strategy that makes each next generation
+    (see Strategies.py), the original scheme described in the README if it is not given. The run is saved to run_dir after every
+    generation. seed is the seed of the run (see agent_rng), a random one if it is not given. The metrics of every generation (see
+    Metrics.py) are appended to metrics_file in run_dir, as json lines, or as csv if it ends in .csv, and the results of every agent to
+    agents.jsonl. observation is the settings of the Observer the agents see the pogo through (see get_config of Observer), the raw state
+    if it is not given, and action_repeat the steps the agents hold every action for (see Pogo)"""
+    def __init__(self, population, run_dir, strategy=None, seed=None, metrics_file='metrics.jsonl', observation=None, action_repeat=1):
+        self.population = population
+        self.run_dir = run_dir
+        self.strategy = TopFifth() if strategy is None else strategy
+        self.seed = new_seed() if seed is None else seed
+        self.metrics_file = metrics_file
+        self.observation = observation or {'history': 1, 'normalize': False}
+        self.action_repeat = action_repeat
+        self.metrics = Metrics(os.path.join(run_dir, metrics_file), os.path.join(run_dir, 'agents.jsonl'))
+
+        # Keep track of the generations
+        self.generation_number = 0
+        self.mutation_rate = None # the mutation rate the population was made with, None for random agents
+        self.fitnesses = [None] * len(population) # the fitness of every agent kept from the last generation, None for the new ones
+        self.best_agent = None # None until the first generation has been evaluated
+        self.best_distance = 0
+        self.best_fitness = None # the fitness of the best agent
+        self.best_mutation_rate = None # the mutation rate the generation of the best agent was made with
+        self.episodes_run = 0 # the number of simulated episodes so far
+        self.episodes_to_threshold = None # the number of episodes it took an agent to reach distance_threshold
+        self.cache = None # the FitnessCache saved with the run, see keep_cache
+        self.cache_file = None # the file in run_dir the cache was last saved to
+
+    """Takes the distance and fitness each agent of the current generation reached, and the number of episodes that were simulated to get
+    them. Keeps track of the overall best agent, makes the next generation with the strategy, saves the run, and records the metrics of
+    the generation. Returns the record of the metrics"""
+    def next_generation(self, agent_distances, evaluation, episodes_run=None):
+        episodes_run = len(self.population) if episodes_run is None else episodes_run
+        self.episodes_run += episodes_run
+        for i in range(len(self.population)): #keep track of the best agent
+            if self.best_agent is None or agent_distances[i] > self.best_distance:
+                self.best_agent = self.population[i]
+                self.best_distance = agent_distances[i]
+                self.best_fitness = evaluation[i]
+                self.best_mutation_rate = self.mutation_rate
+        if self.episodes_to_threshold is None and self.best_distance >= distance_threshold:
+            self.episodes_to_threshold = self.episodes_run
+
+        self.metrics.mark()
+        population_size = len(self.population)
+        mutation_rate = getattr(self.strategy, 'mutation_rate', getattr(self.strategy, 'sigma', 0.0)) # the rate the children are made with
+        diversity = np.mean(np.std([agent.genome for agent in self.population], axis=0)) # how far apart the agents are
+        fitness_of = {id(agent): float(fitness) for agent, fitness in zip(self.population, evaluation)}
+        self.population = self.strategy.next_generation(self.population, evaluation, generation_rng(self.seed, self.generation_number + 1))
+        self.fitnesses = [fitness_of.get(id(agent)) for agent in self.population]
+        self.mutation_rate = float(mutation_rate)
+        self.generation_number += 1
+        self.metrics.lap('reproduction')
+        self.save()
+        self.metrics.record_agents(self.generation_number - 1, agent_distances, evaluation)
+        self.metrics.lap('save')
+        return self.metrics.record(self.generation_number - 1, episodes_run, population_size=population_size,
+                                   mean_fitness=float(np.mean(evaluation)), best_fitness=float(np.max(evaluation)),
+                                   mean_distance=float(np.mean(agent_distances)), best_distance=float(self.best_distance),
+                                   total_episodes=self.episodes_run, mutation_rate=float(mutation_rate), diversity=float(diversity))
+
+    """Saves the run to run_dir. The population of each generation is written to its own file before state.json is pointed at it, so a run
+    that is stopped while saving can always be resumed from the last generation that was saved completely"""
+    def save(self):
+        os.makedirs(self.run_dir, exist_ok=True)
+        population_file = f'generation_{self.generation_number}.pogo'
+        save_population(os.path.join(self.run_dir, population_file), self.population, generation=self.generation_number,
+                        strategy=self.strategy.name, mutation_rate=self.mutation_rate, fitnesses=self.fitnesses)
+        if self.best_agent is not None:
+            self.best_agent.save(os.path.join(self.run_dir, 'best_agent.tmp'), generation=self.generation_number, distance=float(self.best_distance),
+                                 fitness=float(self.best_fitness), mutation_rate=self.best_mutation_rate, observation=self.observation,
+                                 action_repeat=self.action_repeat)
+            os.replace(os.path.join(self.run_dir, 'best_agent.tmp'), os.path.join(self.run_dir, 'best_agent.pogo'))
+        previous_cache_file = self.cache_file
+        if self.cache is not None:
+            self.cache_file = f'fitness_cache_{self.generation_number}.json'
+            self.cache.save(os.path.join(self.run_dir, self.cache_file))
+
+        state = {
+            'population_file': population_file,
+            'generation_number': self.generation_number,
+            'strategy': self.strategy.get_state(),
+            'metrics_file': self.metrics_file,
+            'observation': self.observation,
+            'action_repeat': self.action_repeat,
+            'best_distance': float(self.best_distance),
+            'best_fitness': None if self.best_fitness is None else float(self.best_fitness),
+            'episodes_run': self.episodes_run,
+            'episodes_to_threshold': self.episodes_to_threshold,
+            'seed': self.seed,
+            'cache_file': self.cache_file,
+        }
+        with open(os.path.join(self.run_dir, 'state.tmp'), 'w') as file:
+            json.dump(state, file)
+        os.replace(os.path.join(self.run_dir, 'state.tmp'), os.path.join(self.run_dir, 'state.json'))
+
+        # the previous generation is no longer needed once state.json points at this one
+        previous_file = os.path.join(self.run_dir, f'generation_{self.generation_number - 1}.pogo')
+        if os.path.exists(previous_file):
+            os.remove(previous_file)
+        if previous_cache_file is not None and previous_cache_file != self.cache_file:
+            os.remove(os.path.join(self.run_dir, previous_cache_file))
+
+    """Keeps cache (see FitnessCache.py) with the run: it is saved with every generation, and the results saved with the run are loaded
+    into it. This way a resumed run does not simulate the agents it already evaluated again, and counts its episodes exactly like a run
+    that was never stopped"""
+    def keep_cache(self, cache):
+        self.cache = cache
+        if self.cache_file is not None:
+            cache.load(os.path.join(self.run_dir, self.cache_file))
+
+    """Loads a run saved in run_dir, including its seed, so that training continues exactly as if it had never been stopped"""
+    @staticmethod
+    def load(run_dir):
+        with open(os.path.join(run_dir, 'state.json')) as file:
+            state = json.load(file)
+        population, metadata = load_population(os.path.join(run_dir, state['population_file']), copy=True) # the file is replaced by the next save
+
+        trainer = Trainer(population, run_dir, load_strategy(state['strategy']), state['seed'], state['metrics_file'], state['observation'],
+                          state['action_repeat'])
+        trainer.generation_number = state['generation_number']
+        trainer.mutation_rate = metadata['mutation_rate']
+        trainer.fitnesses = metadata['fitnesses']
+        trainer.best_distance = state['best_distance']
+        trainer.best_fitness = state['best_fitness']
+        trainer.episodes_run = state['episodes_run']
+        trainer.episodes_to_threshold = state['episodes_to_threshold']
+        trainer.cache_file = state['cache_file']
+        if os.path.exists(os.path.join(run_dir, 'best_agent.pogo')):
+            networks, best_metadata = load_population(os.path.join(run_dir, 'best_agent.pogo'), copy=True)
+            trainer.best_agent = networks[0]
+            trainer.best_mutation_rate = best_metadata['mutation_rate']
+        return trainer
+
+"""Returns a new run directory in runs/, named after the time the run started"""
+def new_run_dir():
+    return os.path.join('runs', time.strftime('%Y-%m-%d_%H-%M-%S'))
+
+"""Returns a random seed for a run that was not given one. It is saved with the run, so the run can still be repeated"""
+def new_seed():
+    return int(np.random.SeedSequence().entropy % 2**63)
+
+"""Returns the random number generator of the agent at index of the given generation of the run with the given seed. The first
+generation is generation 0. Generators of different agents are independent of each other"""
+def agent_rng(seed, generation, index):
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(0, generation, index)))
+
+"""Returns the random number generator the children of the given generation are made with, for a run with the given seed"""
+def generation_rng(seed, generation):
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(2, generation)))
+
+"""Returns the random number generator the pushes the episodes start with are drawn from, for a run with the given seed"""
+def episode_rng(seed):
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(3,)))
+
+"""Returns the random number generator the child with the given number of a steady state run is made with (see SteadyState.py)"""
+def child_rng(seed, number):
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(5, number)))
+
+"""Returns the seed of the island at index of an island run with the given seed (see islands.py). Every island is a run of its own with
+this seed, so the islands start from different agents"""
+def island_seed(seed, index):
+    return int(np.random.SeedSequence(seed, spawn_key=(4, index)).generate_state(1, np.uint64)[0] >> 1)
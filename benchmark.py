@@ -0,0 +1,173 @@
+# This file measures how fast the hot paths of training are: stepping the physics, calculating the neural networks forward, and making new
+# generations, as well as how long the evaluate command of cli.py takes to import what it needs. Everything is seeded, so two runs do the
+# same work and only the machine and the code change the numbers. The results are written to a json file, and can be compared against the
+# results of an earlier run to catch changes that made something slower.
+#
+#   python benchmark.py                                   measure and write runs/benchmark.json
+#   python benchmark.py --output baseline.json            measure and write baseline.json
+#   python benchmark.py --compare baseline.json           measure, and flag everything more than 10% slower than in baseline.json
+#
+# Jacob Karty 12/7/2024
+
+from Pogo import Pogo
+from NeuralNet import NeuralNetwork, Population
+from Strategies import TopFifth
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import numpy as np
+import pymunk
+
+layers = [12, 20, 20, 20, 20, 20, 20, 5]
+population_sizes = [30, 300, 3000]
+seed = 0
+
+"""Calls function over and over for at least min_time seconds, repeats times, and returns the seconds a single call took in the fastest
+repeat. The fastest repeat is the one least disturbed by whatever else the machine was doing"""
+def time_call(function, min_time=0.2, repeats=5):
+    calls = 1
+    while True: # find how many calls take at least min_time
+        start = time.perf_counter()
+        for i in range(calls):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        calls *= 2 if elapsed == 0 else max(2, int(min_time / elapsed * 1.2))
+    best = elapsed / calls
+    for i in range(repeats - 1):
+        start = time.perf_counter()
+        for i in range(calls):
+            function()
+        best = min(best, (time.perf_counter() - start) / calls)
+    return best
+
+"""Measures the physics of a single pogo: steps of the space per second, and how long resetting, getting the state and applying actions
+take. The pogo is stepped with random actions through a whole episode, resetting it every 10 seconds, so the steps include jumping,
+landing and falling over"""
+def benchmark_physics():
+    rng = np.random.default_rng(seed)
+    pogo = Pogo()
+    episode_steps = 600
+    actions = np.where(rng.random((episode_steps, 5)) >= 0.5, 1, -1)
+
+    step_time = 0
+    steps = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < 1:
+        pogo.reset_simulation()
+        for t in range(episode_steps):
+            pogo.apply_actions(actions[t])
+            step_start = time.perf_counter()
+            pogo.space.step(pogo.time_step)
+            step_time += time.perf_counter() - step_start
+            pogo.steps += 1
+        steps += episode_steps
+
+    pogo.reset_simulation()
+    state = np.zeros(12)
+    return {
+        'space_steps_per_second': steps / step_time,
+        'reset_simulation_us': time_call(pogo.reset_simulation) * 1e6,
+        'get_current_state_us': time_call(pogo.get_current_state) * 1e6,
+        'get_current_state_into_us': time_call(lambda: pogo.get_current_state(state)) * 1e6,
+        'apply_actions_us': time_call(lambda: pogo.apply_actions(actions[0])) * 1e6,
+    }
+
+"""Measures calculating the neural network forward, a single network at a time and a whole population at once as a Population"""
+def benchmark_inference():
+    rng = np.random.default_rng(seed)
+    network = NeuralNetwork(layers, rng=rng)
+    state = rng.random(12) * 2 - 1
+    population = Population([NeuralNetwork(layers, rng=rng) for i in range(300)])
+    states = rng.random((300, 12)) * 2 - 1
+    return {
+        'calculate_forward_per_second': 1 / time_call(lambda: network.calculate_forward(state)),
+        'population_forward_agents_per_second': 300 / time_call(lambda: population.calculate_forward(states)),
+    }
+
+"""Measures making children: make_child one child at a time, and a whole next generation with the default strategy for every population
+size in population_sizes"""
+def benchmark_evolution():
+    rng = np.random.default_rng(seed)
+    results = {}
+    first, second = NeuralNetwork(layers, rng=rng), NeuralNetwork(layers, rng=rng)
+    results['make_child_per_second'] = 1 / time_call(lambda: first.make_child(second, 0.1, rng))
+    for population_size in population_sizes:
+        population = [NeuralNetwork(layers, rng=rng) for i in range(population_size)]
+        fitnesses = rng.random(population_size) * 200
+        strategy = TopFifth(annealing=False)
+        results[f'generation_{population_size}_ms'] = time_call(lambda: strategy.next_generation(population, fitnesses, rng)) * 1e3
+    return results
+
+"""Measures how long a new process takes to import everything the evaluate command of cli.py imports, leaving out the time Python takes to
+start. The imports have to be made in a new process, as a module is only imported once per process. The command fails if the imports
+load pygame or matplotlib, which evaluating an agent does not need"""
+def benchmark_startup(repeats=5):
+    def start_time(code):
+        best = np.inf
+        for i in range(repeats):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, '-c', code], check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+            best = min(best, time.perf_counter() - start)
+        return best
+    imports = ("import sys, cli, Pogo, Evaluator, Observer, NeuralNet, Policy; "
+               "assert not {'pygame', 'matplotlib'} & set(sys.modules), 'evaluating imports pygame or matplotlib'")
+    return {'evaluate_imports_ms': (start_time(imports) - start_time('pass')) * 1e3}
+
+"""Runs every benchmark. Returns a dictionary of the results, and of the machine and versions they were measured with"""
+def run_benchmarks():
+    results = {}
+    for group, benchmark in (('physics', benchmark_physics), ('inference', benchmark_inference), ('evolution', benchmark_evolution),
+                             ('startup', benchmark_startup)):
+        for name, value in benchmark().items():
+            results[f'{group}.{name}'] = value
+            print(f'{group}.{name:<40} {value:14.2f}')
+    return {'results': results, 'machine': platform.platform(), 'processor': platform.processor(), 'python': sys.version.split()[0],
+            'numpy': np.__version__, 'pymunk': pymunk.version, 'time': time.strftime('%Y-%m-%d %H:%M:%S')}
+
+"""Whether a larger value of the result is better. Rates (per second) are better larger, and times (us and ms) are better smaller"""
+def higher_is_better(name):
+    return name.endswith('per_second')
+
+"""Compares results against baseline results, both dictionaries returned by run_benchmarks. Prints how each result changed, and returns
+the names of the results that got worse by more than tolerance (0.1 is 10%)"""
+def compare(results, baseline, tolerance=0.1):
+    regressions = []
+    print(f'\n{"result":<48} {"baseline":>14} {"now":>14} {"change":>8}')
+    for name, old in baseline['results'].items():
+        if name not in results['results']:
+            continue
+        new = results['results'][name]
+        speedup = new / old if higher_is_better(name) else old / new # above 1 is faster
+        flag = ''
+        if speedup < 1 / (1 + tolerance):
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f'{name:<48} {old:14.2f} {new:14.2f} {speedup:7.2f}x{flag}')
+    return regressions
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure how fast the physics, neural networks and evolution are')
+    parser.add_argument('--output', default=os.path.join('runs', 'benchmark.json'), help='the json file the results are written to')
+    parser.add_argument('--compare', metavar='BASELINE', help='a json file written by an earlier run to compare the results against')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='how much slower a result can get before it counts as a regression')
+    args = parser.parse_args()
+
+    results = run_benchmarks()
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as file:
+        json.dump(results, file, indent=2)
+    print(f'The results are written to {args.output}')
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        if regressions:
+            print(f'{len(regressions)} results are more than {args.tolerance:.0%} slower than in {args.compare}')
+            sys.exit(1)
+        print(f'Nothing is more than {args.tolerance:.0%} slower than in {args.compare}')
@@ -0,0 +1,113 @@
+# This file is a single command line for the project, with a subcommand for everything it does:
+#
+#   python cli.py train [--headless] [--seed 5] ...            train a new population, with the options of main.py
+#   python cli.py resume runs/<run> [--headless]               continue a run of main.py, checkpoint.py, islands.py or steady_state.py
+#   python cli.py evaluate runs/<run>/best_agent.pogo          run a saved agent (or a policy) headless and print how it did
+#   python cli.py replay checkpoints/fully_trained.pogo        watch a saved agent (or a policy) in a window
+#   python cli.py play                                         control the pogo yourself (see human_controlled.py)
+#
+# Each subcommand only imports what it uses, once it runs. evaluate never loads pygame or matplotlib, so most of its start up is numpy and
+# pymunk (benchmark.py measures it), and training only loads them when it opens a window or graphs the results. train and resume run the
+# training script in its own process, so it works the same as running the script itself, worker processes and ctrl+c included.
+#
+# Jacob Karty 12/10/2024
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+directory = os.path.dirname(os.path.abspath(__file__))
+
+"""Runs the training script (such as 'main.py') with the given command line arguments, and returns its exit code. ctrl+c reaches the
+script as well, which saves the run before it stops, so this waits for it instead of stopping it"""
+def run_script(script, arguments):
+    process = subprocess.Popen([sys.executable, os.path.join(directory, script)] + arguments)
+    while True:
+        try:
+            return process.wait()
+        except KeyboardInterrupt:
+            pass
+
+"""Returns the script the run saved in run_dir was trained with, from the files it saved"""
+def run_script_of(run_dir):
+    if os.path.exists(os.path.join(run_dir, 'islands.json')):
+        return 'islands.py'
+    with open(os.path.join(run_dir, 'state.json')) as file:
+        if 'children_made' in json.load(file): # see SteadyState.save
+            return 'steady_state.py'
+    return 'main.py' # runs of checkpoint.py are saved the same way, and main.py continues them as well
+
+"""Loads the agent saved at path, a file of NeuralNetwork.save or save_population (index picks the agent of a population) or a policy of
+export_policy. Returns the agent and its metadata, which holds the settings of the Observer it was trained to see the pogo through and
+the steps it held every action for, if it was saved by a run"""
+def load_agent(path, index=0):
+    if path.endswith('.policy'):
+        from Policy import Policy
+        policy = Policy(path)
+        return policy, policy.metadata
+    from NeuralNet import load_population
+    networks, metadata = load_population(path)
+    return networks[index], metadata
+
+"""Runs the agent saved at args.agent for args.episodes episodes, the first standing still and the rest with the pushes main.py uses, and
+prints the distance and fitness of each and their averages. The agent holds every action for args.action_repeat steps, the steps it
+was trained with if that is None. Draws every episode if replay is true, stopping when the window is closed"""
+def run_agent(args, replay=False):
+    from Pogo import Pogo
+    from Evaluator import run_episode, episode_pushes
+    from Observer import Observer
+    agent, metadata = load_agent(args.agent, args.index)
+    action_repeat = args.action_repeat or metadata.get('action_repeat', 1)
+    renderer = None
+    if replay:
+        from Renderer import Renderer
+        renderer = Renderer()
+    pogo = Pogo(action_repeat=action_repeat)
+    observer = Observer(**(metadata.get('observation') or {}))
+    results = []
+    for push in episode_pushes(args.seed, args.episodes, args.push_speed):
+        results.append(run_episode(pogo, agent, renderer, push, observer=observer))
+        if renderer is not None and not renderer.running: # the episode was cut short when the window was closed
+            results.pop()
+            break
+        print(f'Episode {len(results) - 1}: the agent reached {results[-1][0]:.2f} with fitness {results[-1][1]:.2f}')
+    if renderer is not None:
+        renderer.close()
+    if results:
+        distances, fitnesses = zip(*results)
+        print(f'Over {len(results)} episodes the agent reached {sum(distances) / len(results):.2f} on average, '
+              f'with an average fitness of {sum(fitnesses) / len(results):.2f}')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Train, evaluate and watch agents that move the pogo to the right')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('train', add_help=False, help='train a new population with main.py, any other arguments are passed on to it')
+    resume = subparsers.add_parser('resume', help='continue a saved run with the script that trained it, other arguments are passed on')
+    resume.add_argument('run_dir', help='the directory of the run')
+    for name, description in (('evaluate', 'run a saved agent headless and print how far it got'),
+                              ('replay', 'watch a saved agent in a window')):
+        subparser = subparsers.add_parser(name, help=description)
+        subparser.add_argument('agent', help='a saved agent or population (.pogo), or a policy of export_policy.py (.policy)')
+        subparser.add_argument('--index', type=int, default=0, help='the agent to run when the file holds a population')
+        subparser.add_argument('--episodes', type=int, default=1, help='the number of episodes to run')
+        subparser.add_argument('--push-speed', type=float, default=20, help='the largest push an episode but the first starts with')
+        subparser.add_argument('--seed', type=int, default=0, help='the seed of the pushes')
+        subparser.add_argument('--action-repeat', type=int, help='the steps every action is held for, as the agent was trained if not given')
+    subparsers.add_parser('play', help='control the pogo yourself')
+    args, arguments = parser.parse_known_args()
+    if arguments and args.command not in ('train', 'resume'):
+        parser.error(f'unrecognized arguments: {" ".join(arguments)}')
+
+    if args.command == 'train':
+        sys.exit(run_script('main.py', arguments))
+    elif args.command == 'resume':
+        sys.exit(run_script(run_script_of(args.run_dir), ['--resume', args.run_dir] + arguments))
+    elif args.command == 'evaluate':
+        run_agent(args)
+    elif args.command == 'replay':
+        run_agent(args, replay=True)
+    else:
+        from human_controlled import play
+        play()
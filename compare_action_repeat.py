@@ -0,0 +1,57 @@
+# This file trains the same first generation headless with every action repeat in action_repeats (the physics steps every action is held
+# for, see Pogo), and reports what each costs and what it reaches: the episodes and simulated seconds per second, the share of the time
+# spent calculating the networks forward, and the best distance after the same number of generations. The agents are run one after another
+# like main.py runs them, through the same Trainer, fitness cache and evaluation, and the runs are saved in runs/ so they can be looked at
+# or resumed with main.py.
+#
+#   python compare_action_repeat.py
+#
+# Jacob Karty 12/10/2024
+
+from Pogo import Pogo
+from Evaluator import run_episode, environment_config
+from FitnessCache import FitnessCache
+from NeuralNet import NeuralNetwork
+from Trainer import Trainer, new_run_dir, agent_rng
+from Metrics import load_metrics
+import numpy as np
+import os
+
+# Comparison parameters
+population_size = 30
+hidden_layers = [20, 20, 20, 20, 20, 20]
+action_repeats = [1, 2, 3, 4]
+generations = 30 # the generations every action repeat is trained for
+seed = 0
+
+"""Trains the population for generations generations with every action held for action_repeat steps. Returns the trainer of the run"""
+def train(population, action_repeat, run_dir):
+    trainer = Trainer(population, run_dir, seed=seed, action_repeat=action_repeat)
+    pogo = Pogo(action_repeat=action_repeat)
+    cache = FitnessCache(environment_config(pogo))
+    trainer.keep_cache(cache)
+    evaluate = lambda agents: [run_episode(pogo, agent, metrics=trainer.metrics) for agent in agents]
+    trainer.metrics.start_generation()
+    while trainer.generation_number < generations:
+        misses = cache.misses
+        distances, fitnesses = np.array(cache.evaluate(trainer.population, evaluate)).T
+        trainer.next_generation(distances, fitnesses, cache.misses - misses)
+    return trainer
+
+if __name__ == '__main__':
+    layers = [12] + hidden_layers + [5]
+    population = [NeuralNetwork(layers, rng=agent_rng(seed, 0, i)) for i in range(population_size)]
+    comparison_dir = new_run_dir()
+    time_step = Pogo().time_step
+
+    print(f'Training a population of {population_size} for {generations} generations with every action repeat')
+    print(f'{"action repeat":>13} {"episodes/s":>11} {"simulated s/s":>14} {"forward":>8} {"best distance":>14} {"mean distance":>14}')
+    for action_repeat in action_repeats:
+        trainer = train(population, action_repeat, os.path.join(comparison_dir, f'action_repeat_{action_repeat}'))
+        records = load_metrics(trainer.metrics.path)
+        wall_time = sum(record['wall_time'] for record in records)
+        episodes = sum(record['episodes'] for record in records)
+        simulated_time = sum(record['steps'] for record in records) * time_step
+        forward = sum(record['forward_time'] for record in records) / wall_time
+        print(f'{action_repeat:>13} {episodes / wall_time:>11.1f} {simulated_time / wall_time:>14.1f} {forward:>8.0%} '
+              f'{trainer.best_distance:>14.2f} {records[-1]["mean_distance"]:>14.2f}')
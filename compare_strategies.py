@@ -0,0 +1,50 @@
+# This file trains the same first generation with every evolution strategy (see Strategies.py), headless, and reports how many simulated
+# episodes each strategy takes until an agent reaches the 500 pixel mark the README's best agents reach. Episodes are counted rather than
+# generations or seconds, as that is what training costs no matter the population size or the machine. Every strategy runs through the same
+# Trainer, fitness cache and evaluation as main.py, and the runs are saved in runs/ so they can be looked at or resumed with main.py.
+#
+# Jacob Karty 12/6/2024
+
+from Pogo import MultiPogo
+from Evaluator import run_generation, environment_config
+from FitnessCache import FitnessCache
+from NeuralNet import NeuralNetwork
+from Trainer import Trainer, new_run_dir, agent_rng, distance_threshold
+from Strategies import TopFifth, Tournament, EvolutionStrategy
+import numpy as np
+import os
+import time
+
+# Comparison parameters
+population_size = 50
+hidden_layers = [20, 20, 20, 20, 20, 20]
+max_episodes = 20000 # the episodes each strategy gets to reach the threshold
+seed = 0
+
+"""Trains the population with the strategy until an agent reaches distance_threshold or max_episodes episodes have been run. Returns the
+trainer of the run"""
+def train(population, strategy, run_dir):
+    trainer = Trainer(population, run_dir, strategy, seed)
+    pogo = MultiPogo(len(population))
+    cache = FitnessCache(environment_config(pogo))
+    trainer.keep_cache(cache)
+    while trainer.episodes_to_threshold is None and trainer.episodes_run < max_episodes:
+        misses = cache.misses
+        distances, fitnesses = np.array(cache.evaluate(trainer.population, lambda agents: run_generation(pogo, agents))).T
+        trainer.next_generation(distances, fitnesses, cache.misses - misses)
+    return trainer
+
+if __name__ == '__main__':
+    layers = [12] + hidden_layers + [5]
+    population = [NeuralNetwork(layers, rng=agent_rng(seed, 0, i)) for i in range(population_size)]
+    comparison_dir = new_run_dir()
+
+    print(f'Episodes each strategy takes to reach {distance_threshold} pixels, with a population of {population_size} and at most '
+          f'{max_episodes} episodes')
+    print(f'{"strategy":>10} {"episodes to threshold":>22} {"generations":>12} {"best distance":>14} {"time (s)":>9}')
+    for strategy in (TopFifth(), Tournament(), EvolutionStrategy()):
+        start = time.perf_counter()
+        trainer = train(population, strategy, os.path.join(comparison_dir, strategy.name))
+        episodes = trainer.episodes_to_threshold if trainer.episodes_to_threshold is not None else f'> {trainer.episodes_run}'
+        print(f'{strategy.name:>10} {episodes:>22} {trainer.generation_number:>12} {trainer.best_distance:>14.2f} '
+              f'{time.perf_counter() - start:>9.1f}')
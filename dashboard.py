@@ -0,0 +1,109 @@
+# This file shows the metrics of a training run live, while the run trains. It runs in its own process and only reads the files the run
+# appends to (metrics.jsonl and agents.jsonl in the run directory, see Metrics.py), so it never blocks or slows the training, and it can
+# follow a run on another machine through a shared folder. Every few seconds it reads the new records and redraws the fitness of every
+# agent, the distances, the mutation rate and where the time of each generation went.
+#
+#   python dashboard.py                          follow the newest run in runs/
+#   python dashboard.py runs/<run>               follow that run
+#   python dashboard.py runs/<run> --save a.png  without a window, keep redrawing a.png (for machines without a screen)
+#
+# Jacob Karty 12/8/2024
+
+from Metrics import Metrics, MetricsTail
+import argparse
+import glob
+import json
+import os
+import time
+import matplotlib
+
+"""Returns the run directory in runs/ that was changed last"""
+def latest_run():
+    runs = glob.glob(os.path.join('runs', '*', ''))
+    if not runs:
+        raise SystemExit('There are no runs in runs/ to follow')
+    return max(runs, key=os.path.getmtime)
+
+"""Returns the name of the metrics file of the run, from its state.json if it has been saved"""
+def find_metrics_file(run_dir):
+    state_path = os.path.join(run_dir, 'state.json')
+    if os.path.exists(state_path):
+        with open(state_path) as file:
+            return json.load(file)['metrics_file']
+    return 'metrics.jsonl'
+
+"""Redraws every plot of the figure from all the records read so far"""
+def draw(axes, records, agents):
+    for ax in axes.flat:
+        ax.clear()
+    generations = [record['generation'] for record in records]
+
+    fitness_ax, distance_ax, mutation_ax, time_ax = axes.flat
+    for agent_record in agents: # every agent as a dot, so the spread of the population shows
+        fitness_ax.scatter([agent_record['generation']] * len(agent_record['fitnesses']), agent_record['fitnesses'], s=4, color='0.7')
+    fitness_ax.plot(generations, [record['mean_fitness'] for record in records], color='b', label='mean')
+    fitness_ax.plot(generations, [record['best_fitness'] for record in records], color='g', label='best')
+    fitness_ax.set_title('Fitness')
+
+    distance_ax.plot(generations, [record['mean_distance'] for record in records], color='b', label='mean')
+    distance_ax.plot(generations, [record['best_distance'] for record in records], color='g', label='overall best')
+    distance_ax.set_title('Distance (pixels)')
+
+    mutation_ax.plot(generations, [record.get('mutation_rate') for record in records], color='r')
+    mutation_ax.set_title('Mutation rate')
+
+    phases = [phase for phase in Metrics.phases + ('other',) if any(record[f'{phase}_time'] for record in records)]
+    if phases:
+        time_ax.stackplot(generations, [[record[f'{phase}_time'] for record in records] for phase in phases], labels=phases)
+    time_ax.set_title('Time of each generation (s)')
+
+    for ax in axes.flat:
+        ax.set_xlabel('Generation')
+        ax.grid(True)
+        if ax.get_legend_handles_labels()[0]:
+            ax.legend(loc='upper left', fontsize='small')
+    if records:
+        last = records[-1]
+        axes.flat[0].figure.suptitle(f"Generation {last['generation']:.0f}: {last['steps_per_second']:.0f} steps/s, "
+                                     f"{last['total_episodes']:.0f} episodes")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Show the metrics of a training run live')
+    parser.add_argument('run_dir', nargs='?', help='the run directory to follow, the newest run in runs/ if not given')
+    parser.add_argument('--metrics-file', help='the metrics file in the run directory, read from state.json if not given')
+    parser.add_argument('--interval', type=float, default=2, help='the seconds between reading the files')
+    parser.add_argument('--save', metavar='IMAGE', help='redraw this image file instead of opening a window')
+    args = parser.parse_args()
+
+    if args.save:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    run_dir = args.run_dir or latest_run()
+    metrics_tail = MetricsTail(os.path.join(run_dir, args.metrics_file or find_metrics_file(run_dir)))
+    agents_tail = MetricsTail(os.path.join(run_dir, 'agents.jsonl'))
+    print(f'Following {metrics_tail.path}')
+
+    figure, axes = plt.subplots(2, 2, figsize=(12, 8))
+    figure.canvas.manager.set_window_title(f'Training of {run_dir}')
+    records = []
+    agents = []
+    try:
+        while True:
+            new_records = metrics_tail.read()
+            new_agents = agents_tail.read()
+            if new_records or new_agents or not records:
+                records += new_records
+                agents += new_agents
+                draw(axes, records, agents)
+                figure.tight_layout()
+                if args.save:
+                    figure.savefig(args.save)
+            if args.save:
+                time.sleep(args.interval)
+            else:
+                plt.pause(args.interval) # lets the window respond while waiting
+                if not plt.fignum_exists(figure.number): # the window was closed
+                    break
+    except KeyboardInterrupt:
+        pass
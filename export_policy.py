@@ -0,0 +1,72 @@
+# This file exports a saved agent as a policy (see Policy.py) and measures how closely the policy follows it: how often it presses the same
+# buttons on the states of a real episode and on random states around them, whether an episode run with it ends the same way, and how long
+# loading and calculating forward take for the policy and the original network.
+#
+#   python export_policy.py                                             export checkpoints/fully_trained.pogo to runs/fully_trained.policy
+#   python export_policy.py runs/<run>/best_agent.pogo runs/best.policy --dtype float16
+#
+# Jacob Karty 12/8/2024
+
+from Pogo import Pogo
+from Evaluator import run_episode
+from NeuralNet import NeuralNetwork, load_population
+from Observer import Observer
+from Policy import Policy, export_policy
+from benchmark import time_call
+import argparse
+import os
+import numpy as np
+
+class Recorder:
+    """Calculates the network forward while keeping every state it was given"""
+    def __init__(self, network):
+        self.network = network
+        self.states = []
+
+    def calculate_forward(self, value):
+        self.states.append(np.array(value))
+        return self.network.calculate_forward(value)
+
+"""Returns the fraction of the states where the policy presses the same buttons as the network, counting every button and whole states"""
+def agreement(network, policy, states):
+    expected = np.array([network.calculate_forward(state) for state in states])
+    actual = np.array([policy.calculate_forward(state).copy() for state in states])
+    return np.mean(expected == actual), np.mean(np.all(expected == actual, axis=1))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export a saved agent as a policy, and measure how closely the policy follows it')
+    parser.add_argument('agent', nargs='?', default='checkpoints/fully_trained.pogo', help='the saved agent to export')
+    parser.add_argument('output', nargs='?', help='the policy file to write, runs/<name of the agent>.policy if not given')
+    parser.add_argument('--index', type=int, default=0, help='the agent to export when the file holds a population')
+    parser.add_argument('--dtype', choices=['float32', 'float16'], default='float32', help='the type the weights are stored as')
+    args = parser.parse_args()
+    output = args.output or os.path.join('runs', os.path.splitext(os.path.basename(args.agent))[0] + '.policy') # runs/ is not checked in
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+
+    networks, metadata = load_population(args.agent)
+    network = networks[args.index]
+    observation = metadata.get('observation') # the policy has to see the pogo the way the agent was trained to
+    action_repeat = metadata.get('action_repeat', 1)
+    export_policy(network, output, args.dtype, source=args.agent, observation=observation, action_repeat=action_repeat)
+    policy = Policy(output)
+    print(f'Exported {args.agent} to {output} ({os.path.getsize(output)} bytes, {os.path.getsize(args.agent)} bytes before)')
+
+    # the states of a real episode, and random states spread around them like the episode is
+    pogo = Pogo(action_repeat=action_repeat)
+    observer = Observer(**(observation or {}))
+    recorder = Recorder(network)
+    distance, fitness = run_episode(pogo, recorder, observer=observer)
+    states = np.array(recorder.states)
+    rng = np.random.default_rng(0)
+    random_states = states.mean(axis=0) + states.std(axis=0) * rng.standard_normal((10000, states.shape[1]))
+    for name, test_states in (('episode', states), ('random', random_states)):
+        buttons, whole = agreement(network, policy, test_states)
+        print(f'Same buttons on {len(test_states)} {name} states: {buttons:.4%} of buttons, {whole:.4%} of states')
+    policy_distance, policy_fitness = run_episode(pogo, policy, observer=observer)
+    print(f'The network reached {distance:.2f} with fitness {fitness:.2f}, the policy {policy_distance:.2f} with fitness {policy_fitness:.2f}')
+
+    state = states[0]
+    print(f'Loading: {time_call(lambda: Policy(output)) * 1e3:.3f} ms for the policy, '
+          f'{time_call(lambda: NeuralNetwork.load(args.agent, args.index)) * 1e3:.3f} ms for the network')
+    print(f'Calculating forward: {time_call(lambda: policy.calculate_forward(state)) * 1e6:.2f} us for the policy, '
+          f'{time_call(lambda: network.calculate_forward(state)) * 1e6:.2f} us for the network')
@@ -0,0 +1,140 @@
+# This file trains several populations at once, as islands. Every island is a run of its own with its own seed, trained headless by its
+# own process with the usual evolution strategy, and every migration_interval generations it sends copies of its best agents to the next
+# island and replaces its newest children with the agents the island before it sent (see Migration.py). The islands explore apart from
+# each other, so the agents stay more varied than in one large population, while the best agents still spread between them. Every island
+# is saved to its own run directory inside the island run and can be followed with dashboard.py.
+#
+#   python islands.py                                            train every island as a process on this machine
+#   python islands.py --run-dir /shared/run --island 2           on several machines: train only island 2, with the run in a shared folder
+#   python islands.py --resume runs/<run>                        continue every island of a run from the generation it left off at
+#
+# Jacob Karty 12/9/2024
+
+from Pogo import MultiPogo
+from Evaluator import run_generation, environment_config
+from FitnessCache import FitnessCache
+from NeuralNet import NeuralNetwork
+from Trainer import Trainer, new_run_dir, new_seed, agent_rng, island_seed
+from Strategies import TopFifth, Tournament
+from Migration import DirectoryMigration
+from Metrics import summary, load_metrics
+import argparse
+import json
+import multiprocessing
+import os
+import time
+import numpy as np
+
+# Island parameters
+islands = 4 # the number of islands (also set with --islands)
+population_size = 30 # the agents of each island
+hidden_layers = [20, 20, 20, 20, 20, 20]
+strategy = 'top_fifth' # how each next generation of an island is made: 'top_fifth' or 'tournament' (see Strategies.py)
+migration_interval = 5 # the generations between migrations
+migrants = 2 # the best agents each island sends every migration
+migration_timeout = 600 # the seconds an island waits for the agents of the island before it, before carrying on without them
+max_generations = 50 # the generations every island is trained for
+seed = None # the seed of the island run, every island gets its own seed made from it (None picks a random seed, also set with --seed)
+
+"""Returns the evolution strategy the islands are trained with. The 'es' strategy does not work with migration: its population is samples
+around a mean, and an immigrant put in place of a sample would be taken for a huge sampled noise that drags the mean toward (or away from)
+a foreign genome"""
+def make_strategy():
+    if strategy not in ('top_fifth', 'tournament'):
+        raise ValueError(f"islands can only be trained with 'top_fifth' or 'tournament', not {strategy!r}")
+    return Tournament() if strategy == 'tournament' else TopFifth()
+
+"""Trains the island at index of the island run in run_dir until max_generations, continuing it if it has been saved before"""
+def run_island(run_dir, island, num_islands, run_seed):
+    island_dir = os.path.join(run_dir, f'island_{island}')
+    if os.path.exists(os.path.join(island_dir, 'state.json')):
+        trainer = Trainer.load(island_dir)
+    else:
+        layers = [12] + hidden_layers + [5]
+        trainer_seed = island_seed(run_seed, island)
+        population = [NeuralNetwork(layers, rng=agent_rng(trainer_seed, 0, i)) for i in range(population_size)]
+        trainer = Trainer(population, island_dir, make_strategy(), trainer_seed)
+        trainer.save()
+    migration = DirectoryMigration(os.path.join(run_dir, 'migration'), island, num_islands, migration_timeout)
+    pogo = MultiPogo(len(trainer.population))
+    cache = FitnessCache(environment_config(pogo))
+    trainer.keep_cache(cache)
+
+    trainer.metrics.start_generation()
+    while trainer.generation_number < max_generations:
+        generation = trainer.generation_number
+        misses = cache.misses
+        results = cache.evaluate(trainer.population, lambda agents: run_generation(pogo, agents, metrics=trainer.metrics))
+        distances, fitnesses = np.array(results).T
+        emigrants = [trainer.population[i] for i in np.argsort(fitnesses)[::-1][:migrants]]
+        record = trainer.next_generation(distances, fitnesses, cache.misses - misses)
+        print(f'[island {island}] Generation {generation}: best {np.max(distances):.2f}, overall best {trainer.best_distance:.2f}. '
+              f'{summary(record)}', flush=True)
+
+        if num_islands > 1 and (generation + 1) % migration_interval == 0:
+            # the kept agents are at the start of the population, so the newest children make room for the immigrants
+            trainer.metrics.mark()
+            migration.send(generation, emigrants)
+            immigrants = migration.receive(generation)
+            if immigrants:
+                trainer.population[len(trainer.population) - len(immigrants):] = immigrants
+                trainer.save()
+            else:
+                print(f'[island {island}] No agents came from island {(island - 1) % num_islands} within {migration_timeout} seconds', flush=True)
+            trainer.metrics.lap('migration')
+
+"""Returns the metrics records of every island of the island run in run_dir (see Metrics.py), an empty list for an island not started yet"""
+def island_metrics(run_dir, num_islands):
+    return [load_metrics(os.path.join(run_dir, f'island_{island}', 'metrics.jsonl')) for island in range(num_islands)]
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Train several populations as islands that exchange their best agents')
+    parser.add_argument('--islands', type=int, help='the number of islands')
+    parser.add_argument('--island', type=int, help='only train this island, for running the islands on several machines')
+    parser.add_argument('--run-dir', help='the directory of the island run, which has to be shared when the islands run on several machines')
+    parser.add_argument('--resume', metavar='RUN_DIR', help='continue the island run saved in RUN_DIR')
+    parser.add_argument('--seed', type=int, help='the seed of the island run')
+    args = parser.parse_args()
+    make_strategy() # check the strategy before any island starts
+
+    # the settings every island has to agree on are saved with the run, so islands started on other machines or resumed use them
+    run_dir = args.resume or args.run_dir or new_run_dir()
+    settings_path = os.path.join(run_dir, 'islands.json')
+    if os.path.exists(settings_path):
+        with open(settings_path) as file:
+            settings = json.load(file)
+    else:
+        settings = {'islands': args.islands or islands, 'seed': args.seed if args.seed is not None else seed if seed is not None else new_seed()}
+        os.makedirs(run_dir, exist_ok=True)
+        with open(settings_path + '.tmp', 'w') as file:
+            json.dump(settings, file)
+        os.replace(settings_path + '.tmp', settings_path)
+    print(f'Island run {run_dir} with {settings["islands"]} islands and seed {settings["seed"]}')
+
+    start = time.perf_counter()
+    episodes_before = sum(records[-1]['total_episodes'] for records in island_metrics(run_dir, settings['islands']) if records)
+    if args.island is not None:
+        run_island(run_dir, args.island, settings['islands'], settings['seed'])
+    else:
+        processes = [multiprocessing.Process(target=run_island, args=(run_dir, island, settings['islands'], settings['seed']))
+                     for island in range(settings['islands'])]
+        for process in processes:
+            process.start()
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt: # every island has saved its last generation, so the run can be resumed
+            for process in processes:
+                process.join()
+
+        episodes = 0
+        for island, records in enumerate(island_metrics(run_dir, settings['islands'])):
+            if records:
+                episodes += records[-1]['total_episodes']
+                print(f'Island {island}: overall best {records[-1]["best_distance"]:.2f} after {records[-1]["total_episodes"]:.0f} episodes, '
+                      f'diversity {records[-1]["diversity"]:.4f}')
+        genomes = [agent.genome for island in range(settings['islands'])
+                   for agent in Trainer.load(os.path.join(run_dir, f'island_{island}')).population]
+        print(f'Diversity of all the islands together: {np.mean(np.std(genomes, axis=0)):.4f}')
+        elapsed = time.perf_counter() - start
+        print(f'{episodes - episodes_before:.0f} episodes in {elapsed:.1f} seconds, {(episodes - episodes_before) / elapsed:.1f} per second')
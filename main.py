@@ -1,17 +1,24 @@
-# This file randomly creates a population of agents and trains them. It prints out the weights and biases of the best agent from each generation
-# for the user to copy and paste into the checkpoint file. It also prints the overall best agent at the end of training, as well as graphing the
-# results. The goal of the agent is to move to the right.
+# This file randomly creates a population of agents and trains them. After each generation the whole run is saved to a run directory in
+# runs/, which includes the overall best agent that checkpoint.py can continue training from and the metrics of every generation. Run with
+# --resume <run directory> to continue a run from the generation it left off at. At the end of training it graphs the results to the run
+# directory. The goal of the agent is to move to the right.
 #
 # Jacob Karty 12/3/2024
 
-from Pogo import Pogo
-import pygame
-import pymunk
-import pymunk.pygame_util
+from Pogo import Pogo, MultiPogo
+from NumpyPogo import NumpyPogo
+from Evaluator import run_episode, run_generation, run_episodes, episode_pushes, environment_config, ParallelEvaluator
+from FitnessCache import FitnessCache
 from NeuralNet import NeuralNetwork
-import time
+from Trainer import Trainer, new_run_dir, new_seed, agent_rng, distance_threshold
+from Strategies import TopFifth, Tournament, EvolutionStrategy
+from Metrics import summary, save_fitness_plot
+from Observer import Observer, state_size
+import argparse
+import os
+import subprocess
+import sys
 import numpy as np
-import matplotlib.pyplot as plt
 
 # Training parameters - edit these within reason
 population_size = 30
@@ -21,124 +28,204 @@ annealing = True # this annealing is for the mutation rate
 annealing_step_size = 0.001
 annealing_min = .01
 hidden_layers = [20, 20, 20, 20, 20, 20]
-
-# Initialize the pymunk physics engine
-pogo = Pogo()
-pygame.init()
-screen = pygame.display.set_mode((1200, 600))
-clock = pygame.time.Clock()
-draw_options = pymunk.pygame_util.DrawOptions(screen)
-
-# Create the neural network population
-population = []
-evaluation = []
-agent_distances = []
-layers = [12]
-for layer in hidden_layers:
-    layers.append(layer)
-layers.append(5)
-for i in range(population_size):
-    population.append(NeuralNetwork(layers))
-    evaluation.append(0)
-    agent_distances.append(0)
-
-# Keep track of agents and population
-tic = time.time()
-toc = time.time()
-current_agent = 0
-fitness_plot = []
-best_distance = 0
-best_agent = 0
-generation_number = 0
-print("Generation 0:")
-
-# Simulation loop
-running = True
-while running:
-    #get current state, determine agents response, and apply those responses to the environment
-    current_state = pogo.get_current_state()
-    agent_response = population[current_agent].calculate_forward(current_state)
-    pogo.apply_actions(agent_response)
-
-    # Switch between agents. Give each agent 10 seconds before evaluating it, or if it falls over. Also keep track of when the
-    # generation is over and make a new one
-    if abs(current_state[0])<1.4: # if it falls over, wait a little bit to let it slide
-        toc = time.time()
-
-    if time.time()-tic > 10 or time.time()-toc > 0.5:
-        #determine the fitness of the agent
-        agent_distances[current_agent] = current_state[2] - 300
-        evaluation[current_agent] = agent_distances[current_agent] + (time.time()-tic) * 10 # this is the position of the agent plus how long it stayed up, encouraging the agent to both stay up and move further
-        print(f"Agent {current_agent} reached position {agent_distances[current_agent]} with fitness {evaluation[current_agent]}")
-        if agent_distances[current_agent] > best_distance: #keep track of the best agent
-            best_agent = population[current_agent]
-            best_distance = agent_distances[current_agent]
-
-        #reset simulation
-        current_agent += 1
-        tic = time.time()
-        pogo.reset_simulation()
-
-        if current_agent == population_size: # if the entire population has run
-            # find the average fitness for plotting later
-            avg = sum(evaluation) / len(evaluation)
-            fitness_plot.append(avg)
-
-            #sort by the best agents
-            top_indices = np.argsort(evaluation)[::-1]
-            print(f"The best agent reached {agent_distances[top_indices[0]]} with fitness {evaluation[top_indices[0]]}")
-            population[top_indices[0]].print_network()
-
-            #take top 20% of population and make the next generation
-            children = []
-            num_top_agents = population_size//5
-
-            if elitism: #keep the top 20% of population in the next genreation
-                for i in range(num_top_agents):
-                    children.append(population[top_indices[i]])
-            
-            #determine which agents reproduce with which other agents and how many times
-            reproduction_matrix = NeuralNetwork.generate_weighted_reproduction_matrix(num_top_agents, population_size - len(children))
-            for i in range(len(reproduction_matrix)):
-                for j, value in enumerate(reproduction_matrix[i]):
-                    for k in range(value):
-                        children.append(population[top_indices[i]].make_child(population[top_indices[j]], mutation_rate)) #make the child
-            generation_number += 1
-            print(f'Generation {generation_number}:')
-            population = children
-            current_agent = 0
-
-            #annealing - cool off the mutation rate slowly
-            if annealing:
-                mutation_rate -= annealing_step_size
-            if mutation_rate < annealing_min:
-                mutation_rate = annealing_min
-
-    # exit out of the game if x is pressed
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-    
-    # Step the simulation forward
-    pogo.space.step(1 / 60.0)
-
-    # Draw the objects
-    screen.fill((255, 255, 255))
-    pogo.space.debug_draw(draw_options)
-    pygame.display.flip()
-    clock.tick(60)
-pygame.quit()
-
-
-#print the best agent
-print(f'The overall best agent reached {best_distance}')
-best_agent.print_network()
-
-#plot the average fitness throughout
-plt.plot(fitness_plot, marker='o', linestyle='-', color='b')
-plt.title('Pogostick Evolution')
-plt.xlabel('Generation')
-plt.ylabel('Average Fitness')
-plt.legend()
-plt.grid(True)
-plt.show()
\ No newline at end of file
+seed = None # the seed of the run, two runs with the same seed create the same agents (None picks a random seed, also set with --seed)
+history = 1 # the number of the last states of the pogo stacked into what the agents see, so they can tell how it is moving
+normalize_observations = False # if true, the agents see every value of the state scaled to around -1 to 1 (see Observer.py)
+action_repeat = 1 # the physics steps every action of an agent is held for before it decides again, so it is calculated forward that many times less often
+strategy = 'top_fifth' # how each next generation is made: 'top_fifth' (the scheme described in the README), 'tournament' or 'es' (see Strategies.py, also set with --strategy)
+
+# Evaluation parameters
+episodes = 1 # the number of episodes each agent is evaluated over, its fitness being the average of them
+stop_early = False # if true, agents that are clearly not going to make the top 20% are stopped between episodes (only with the top_fifth strategy)
+stop_confidence = 2 # the standard errors to either side of the average fitness of an agent it has to be outside of to be stopped
+push_speed = 20 # every episode but the first starts with a random push of up to this many pixels per second in x and y
+
+# Display parameters
+headless = False # if true, train without drawing every agent, as fast as the CPU allows (also set by running with --headless)
+render_every = 0 # when headless, show the best agent of every Nth generation in a window (0 never opens a window, also set with --render-every)
+simultaneous = False # if true, the whole generation runs at the same time, which also draws the whole generation at once
+numpy_physics = False # experimental: when headless and simultaneous, simulate with NumpyPogo, which fails validate_numpy_pogo.py and selects other agents than Pymunk
+workers = 1 # when headless, the number of processes that evaluate agents at the same time (0 uses every core)
+max_generations = 0 # stop training after this many generations (0 trains until the window is closed or ctrl+c is pressed)
+
+# Metrics parameters
+metrics_file = 'metrics.jsonl' # the file in the run directory the time of every phase and the fitnesses of each generation are appended to (.csv for csv)
+profile_generation = None # run this generation under cProfile, saving the stats to profile_<generation>.prof in the run directory (also set with --profile).
+                          # With workers only the main process is profiled, not the episodes the workers run
+dashboard = False # if true, open dashboard.py in its own process to graph the metrics live while training (also set with --dashboard)
+
+# Cache parameters
+cache_size = 10000 # the number of agents whose results are kept, so that agents that come up again are not simulated again (0 turns the cache off)
+cache_path = None # a file the cache is also kept in across runs, for example 'runs/fitness_cache.json' (it is always saved with the run)
+
+# Everything below only runs in the main process, so that the worker processes of a ParallelEvaluator can import this file
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Train a population of agents to move the pogo to the right')
+    parser.add_argument('--headless', action='store_true', help='train without drawing every agent, as fast as the CPU allows')
+    parser.add_argument('--render-every', type=int, metavar='N', help='when headless, show the best agent of every Nth generation in a window')
+    parser.add_argument('--resume', metavar='RUN_DIR', help='continue the run saved in RUN_DIR from the generation it left off at')
+    parser.add_argument('--seed', type=int, help='the seed of the run, two runs with the same seed create the same agents')
+    parser.add_argument('--strategy', choices=['top_fifth', 'tournament', 'es'], help='how each next generation is made')
+    parser.add_argument('--profile', type=int, metavar='GENERATION', help='run this generation under cProfile')
+    parser.add_argument('--dashboard', action='store_true', help='graph the metrics live in another process while training')
+    args = parser.parse_args()
+    if args.headless:
+        headless = True
+    if args.render_every is not None:
+        render_every = args.render_every
+    if args.seed is not None:
+        seed = args.seed
+    if args.strategy is not None:
+        strategy = args.strategy
+    if args.profile is not None:
+        profile_generation = args.profile
+    if args.dashboard:
+        dashboard = True
+
+    # Create the neural network population, or load it and the rest of the run when resuming
+    if args.resume:
+        trainer = Trainer.load(args.resume)
+        print(f'Resuming {args.resume} at generation {trainer.generation_number} with the {trainer.strategy.name} strategy')
+    else:
+        if seed is None:
+            seed = new_seed()
+        population = []
+        layers = [state_size * history]
+        for layer in hidden_layers:
+            layers.append(layer)
+        layers.append(5)
+        for i in range(population_size):
+            population.append(NeuralNetwork(layers, rng=agent_rng(seed, 0, i)))
+        if strategy == 'tournament':
+            evolution_strategy = Tournament(mutation_rate)
+        elif strategy == 'es':
+            evolution_strategy = EvolutionStrategy()
+        else:
+            evolution_strategy = TopFifth(mutation_rate, elitism, annealing, annealing_step_size, annealing_min)
+        trainer = Trainer(population, new_run_dir(), evolution_strategy, seed, metrics_file, {'history': history, 'normalize': normalize_observations},
+                          action_repeat)
+        trainer.save()
+    print(f'The seed of the run is {trainer.seed}')
+    if dashboard: # the dashboard only reads the metrics files, so training never waits for it
+        subprocess.Popen([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dashboard.py'), trainer.run_dir,
+                          '--metrics-file', trainer.metrics_file])
+    population_size = len(trainer.population)
+    evaluation = [0] * population_size
+    agent_distances = [0] * population_size
+
+    # Initialize the pymunk physics engine, and the window if every agent is drawn
+    pogo = Pogo(action_repeat=trainer.action_repeat)
+    observer = Observer(**trainer.observation)
+    if simultaneous:
+        if numpy_physics and headless:
+            multi_pogo = NumpyPogo(population_size, action_repeat=trainer.action_repeat)
+        else:
+            multi_pogo = MultiPogo(population_size, action_repeat=trainer.action_repeat)
+        multi_observer = Observer(population_size, **trainer.observation)
+    renderer = None
+    evaluator = None
+    if not headless: # pygame is only loaded when a window is opened
+        from Renderer import Renderer
+        renderer = Renderer()
+    elif workers != 1:
+        evaluator = ParallelEvaluator(workers or None, trainer.observation, trainer.action_repeat)
+    pushes = episode_pushes(trainer.seed, episodes, push_speed)
+    config = environment_config(multi_pogo if simultaneous and evaluator is None else pogo, trainer.seed if episodes > 1 else None, episodes,
+                                push_speed if episodes > 1 else 0, trainer.observation)
+    cache = FitnessCache(config, cache_size, cache_path)
+    trainer.keep_cache(cache) # saved with the run, so that resuming it does not simulate the agents it already evaluated again
+    if stop_early and trainer.strategy.name != 'top_fifth': # the other strategies use the fitness of every agent, not just the top 20%
+        raise ValueError(f"stop_early only works with the 'top_fifth' strategy, not {trainer.strategy.name!r}")
+    num_top_agents = population_size // 5 if stop_early else 0
+    cutoff = -np.inf # the fitness of the last of the top 20% agents of the last generation
+    episodes_run = 0
+
+    """Runs a single episode of each agent the way the display parameters ask for, with the given pushes and give_ups (see run_episode).
+    Returns a list of (distance, fitness), or None if the window was closed before every agent was evaluated"""
+    def evaluate_episode(agents, agent_pushes, give_up):
+        global episodes_run
+        episodes_run += len(agents)
+        if evaluator is not None: # run the agents on the worker processes at once
+            return evaluator.evaluate(agents, agent_pushes, give_up, trainer.metrics)
+        if simultaneous: # run the agents at the same time
+            results = run_generation(multi_pogo, agents, renderer, agent_pushes, give_up, trainer.metrics, multi_observer)
+        else:
+            results = []
+            for agent, push, agent_give_up in zip(agents, agent_pushes, give_up):
+                results.append(run_episode(pogo, agent, renderer, push, agent_give_up, trainer.metrics, observer))
+                if renderer is not None and not renderer.running:
+                    break
+        if renderer is not None and not renderer.running: # exit out of the game if x is pressed
+            return None
+        return results
+
+    """Evaluates a list of agents over every episode, stopping the ones that cannot reach the top 20% early if stop_early is set"""
+    def evaluate(agents):
+        return run_episodes(evaluate_episode, agents, pushes, num_top_agents, cutoff, stop_confidence)
+
+    # Training loop
+    running = True
+    trainer.metrics.start_generation()
+    try:
+        while running:
+            print(f'Generation {trainer.generation_number}:')
+            population = trainer.population
+            profiling = trainer.generation_number == profile_generation
+            if profiling:
+                trainer.metrics.start_profile()
+
+            # Give each agent 10 seconds per episode before evaluating it, or until it falls over. Agents in the cache are not run again
+            hits = cache.hits
+            episodes_run = 0
+            results = cache.evaluate(population, evaluate)
+            if results is None:
+                break
+            for current_agent in range(population_size):
+                agent_distances[current_agent], evaluation[current_agent] = results[current_agent]
+                print(f"Agent {current_agent} reached position {agent_distances[current_agent]} with fitness {evaluation[current_agent]}")
+            print(f"{cache.hits - hits} of the agents were already in the cache, and {episodes_run} of up to "
+                  f"{(population_size - cache.hits + hits) * episodes} episodes were run")
+
+            best_index = np.argmax(evaluation)
+            print(f"The best agent reached {agent_distances[best_index]} with fitness {evaluation[best_index]}")
+
+            # when headless, only the best agent of every few generations is shown
+            if headless and render_every and trainer.generation_number % render_every == 0:
+                from Renderer import Renderer
+                viewer = Renderer()
+                run_episode(pogo, population[best_index], viewer, metrics=trainer.metrics, observer=observer)
+                running = viewer.running
+                viewer.close()
+
+            # when the strategy keeps the top 20%, the next generation has to beat the last of them to make it into its top 20%
+            if num_top_agents and trainer.strategy.kept(population_size) >= num_top_agents:
+                cutoff = np.sort(evaluation)[-num_top_agents]
+
+            # make the next generation with the strategy, and save the run
+            record = trainer.next_generation(agent_distances, evaluation, episodes_run)
+            print(f'Time of the generation: {summary(record)}')
+            if cache_path is not None:
+                cache.save()
+            if profiling:
+                profile_path = os.path.join(trainer.run_dir, f'profile_{trainer.generation_number - 1}.prof')
+                print(trainer.metrics.stop_profile(profile_path))
+                print(f'The profile is saved in {profile_path}')
+
+            if max_generations and trainer.generation_number >= max_generations:
+                running = False
+    except KeyboardInterrupt: # ctrl+c ends training the same way closing the window does
+        pass
+    if renderer is not None:
+        renderer.close()
+    if evaluator is not None:
+        evaluator.close()
+
+
+    print(f'The overall best agent reached {trainer.best_distance} after {trainer.episodes_run} episodes. The run is saved in {trainer.run_dir}')
+    if trainer.episodes_to_threshold is not None:
+        print(f'It took {trainer.episodes_to_threshold} episodes to reach {distance_threshold}')
+
+    #plot the average fitness throughout
+    if os.path.exists(trainer.metrics.path):
+        save_fitness_plot(trainer.metrics.path, os.path.join(trainer.run_dir, 'fitness.png'))
+        print(f'The average fitness of every generation is graphed in {os.path.join(trainer.run_dir, "fitness.png")}')
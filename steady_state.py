@@ -0,0 +1,122 @@
+# This file trains agents with steady state evolution (see SteadyState.py) on a pool of worker processes. Every worker is handed a new child
+# as soon as it is done with the last one, so the workers are never left waiting for the slowest episode of a generation. Every
+# population_size results the run is saved to a run directory and a record is added to its metrics (see Metrics.py), with the share of
+# the time the workers were busy. Run with --compare to also train generation by generation on the same workers for as many episodes, and
+# see how busy the workers were there.
+#
+#   python steady_state.py                         train until max_episodes
+#   python steady_state.py --resume runs/<run>     continue a run from where it was last saved
+#
+# Jacob Karty 12/10/2024
+
+from Evaluator import ParallelEvaluator, time_agent
+from NeuralNet import NeuralNetwork
+from SteadyState import SteadyState
+from Strategies import TopFifth
+from Trainer import new_run_dir, new_seed, agent_rng, generation_rng
+from Metrics import Metrics
+import argparse
+import os
+import queue
+import time
+import numpy as np
+
+# Steady state parameters
+population_size = 30
+mutation_rate = 0.1
+hidden_layers = [20, 20, 20, 20, 20, 20]
+workers = 0 # the number of worker processes (0 uses every core)
+in_flight = 2 # the agents handed out per worker at a time, so a worker has the next one ready when it finishes
+max_episodes = 3000 # stop after this many agents have been evaluated (also set with --max-episodes)
+seed = None # the seed of the run (None picks a random seed, also set with --seed)
+stop_early = False # if true, the episode of a child is given up once it cannot reach the worst agent even if the pogo moved at max_speed (see Evaluator.py)
+
+"""Trains generation by generation on the evaluator like main.py does with workers, for the given number of episodes. Returns the share of
+the time the workers were busy"""
+def generational_utilization(evaluator, layers, episodes, run_seed):
+    population = [NeuralNetwork(layers, rng=agent_rng(run_seed, 0, i)) for i in range(population_size)]
+    strategy = TopFifth(mutation_rate, annealing=False)
+    chunksize = max(1, population_size // (evaluator.workers * 4)) # the same as ParallelEvaluator.evaluate
+    busy = 0
+    start = time.perf_counter()
+    for generation in range(max(1, episodes // population_size)):
+        jobs = [(agent, (0, 0), -np.inf) for agent in population]
+        results = evaluator.pool.map(time_agent, jobs, chunksize)
+        busy += sum(seconds for result, seconds in results)
+        population = strategy.next_generation(population, [fitness for (distance, fitness), seconds in results],
+                                              generation_rng(run_seed, generation + 1))
+    return busy / (evaluator.workers * (time.perf_counter() - start))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Train agents with steady state evolution on a pool of worker processes')
+    parser.add_argument('--resume', metavar='RUN_DIR', help='continue the run saved in RUN_DIR')
+    parser.add_argument('--seed', type=int, help='the seed of the run')
+    parser.add_argument('--max-episodes', type=int, help='stop after this many agents have been evaluated')
+    parser.add_argument('--compare', action='store_true', help='also train generation by generation and compare how busy the workers were')
+    args = parser.parse_args()
+    if args.max_episodes is not None:
+        max_episodes = args.max_episodes
+
+    layers = [12] + hidden_layers + [5]
+    if args.resume:
+        run_dir = args.resume
+        evolution = SteadyState.load(run_dir)
+        initial = []
+    else:
+        run_dir = new_run_dir()
+        evolution = SteadyState(population_size, mutation_rate, new_seed() if args.seed is None else args.seed)
+        initial = [NeuralNetwork(layers, rng=agent_rng(evolution.seed, 0, i)) for i in range(population_size)][::-1]
+    print(f'The seed of the run is {evolution.seed}')
+    metrics = Metrics(os.path.join(run_dir, 'metrics.jsonl'), os.path.join(run_dir, 'agents.jsonl'))
+    evaluator = ParallelEvaluator(workers or None)
+
+    # the workers put every result in finished, and a new agent is handed out for every result taken from it
+    finished = queue.Queue()
+    running = 0
+    busy = 0 # the CPU seconds the workers spent since the last record
+    episodes = 0
+    record_start = start = time.perf_counter()
+    try:
+        while evolution.evaluations < max_episodes:
+            while running < in_flight * evaluator.workers and (initial or len(evolution.population) >= 2):
+                agent = initial.pop() if initial else evolution.make_child()
+                evaluator.submit(agent, lambda result, agent=agent: finished.put((agent, result)), finished.put,
+                                 give_up=evolution.worst() if stop_early else -np.inf)
+                running += 1
+            item = finished.get()
+            running -= 1
+            if isinstance(item, BaseException):
+                raise item
+            agent, ((distance, fitness), seconds) = item
+            evolution.add(agent, distance, fitness)
+            busy += seconds
+            episodes += 1
+
+            if evolution.evaluations % population_size == 0 and evolution.full():
+                utilization = busy / (evaluator.workers * (time.perf_counter() - record_start))
+                metrics.mark()
+                evolution.save(run_dir)
+                metrics.lap('save')
+                metrics.record_agents(evolution.evaluations // population_size, evolution.distances, evolution.fitnesses)
+                metrics.record(evolution.evaluations // population_size, episodes, population_size=population_size,
+                               mean_fitness=float(np.mean(evolution.fitnesses)), best_fitness=float(np.max(evolution.fitnesses)),
+                               mean_distance=float(np.mean(evolution.distances)), best_distance=float(evolution.best_distance),
+                               total_episodes=evolution.evaluations, mutation_rate=mutation_rate, utilization=utilization)
+                print(f'{evolution.evaluations} episodes: best {evolution.best_distance:.2f}, mean fitness {np.mean(evolution.fitnesses):.2f}, '
+                      f'the workers were busy {utilization:.0%} of the time')
+                busy = 0
+                episodes = 0
+                record_start = time.perf_counter()
+    except KeyboardInterrupt:
+        pass
+    evaluator.pool.terminate() # the agents still running are not needed
+    if evolution.full():
+        evolution.save(run_dir)
+    print(f'The overall best agent reached {evolution.best_distance:.2f} after {evolution.evaluations} episodes in '
+          f'{time.perf_counter() - start:.1f} seconds. The run is saved in {run_dir}')
+
+    if args.compare:
+        evaluator = ParallelEvaluator(workers or None)
+        print(f'Generation by generation, the workers were busy '
+              f'{generational_utilization(evaluator, layers, max_episodes, evolution.seed):.0%} of the time')
+        evaluator.close()
@@ -0,0 +1,70 @@
+# This file checks that racing agents in run_episodes stops agents early and still picks the same top agents as running every episode. Run
+# with python -m pytest.
+#
+# Jacob Karty 12/3/2024
+
+from Pogo import Pogo
+from Evaluator import run_episode, run_episodes, episode_pushes
+from NeuralNet import NeuralNetwork
+from Trainer import agent_rng
+import numpy as np
+
+"""Returns the indices of the num_top agents with the highest fitness in results (see run_episodes)"""
+def top(results, num_top):
+    return set(np.argsort([fitness for distance, fitness, complete in results])[-num_top:].tolist())
+
+"""Checks that the top agents of the raced results are those of the full results, that every agent that was not stopped has its full
+result, and that every stopped agent ranks below all of those"""
+def check_same_top(full, raced, num_top):
+    assert top(raced, num_top) == top(full, num_top)
+    lowest = min(fitness for distance, fitness, complete in raced if complete)
+    for (distance, fitness, complete), (full_distance, full_fitness, full_complete) in zip(raced, full):
+        if complete:
+            assert (distance, fitness) == (full_distance, full_fitness)
+        else:
+            assert fitness < lowest
+
+"""Returns an evaluate for run_episodes that gives the agents (indices into scores) the fitness of scores in each round, and counts the
+episodes it runs"""
+def fake_evaluate(scores):
+    def evaluate(agents, pushes, give_up):
+        episode = evaluate.rounds
+        evaluate.rounds += 1
+        evaluate.episodes += len(agents)
+        return [(score, score) for score in scores[agents, episode]]
+    evaluate.rounds = 0
+    evaluate.episodes = 0
+    return evaluate
+
+"""Agents whose episodes are their own average fitness plus noise of their own size"""
+def test_noisy_agents():
+    rng = np.random.default_rng(11)
+    episodes, num_top = 10, 12
+    means = rng.uniform(0, 200, 60)
+    scores = means[:, None] + rng.normal(0, rng.uniform(5, 40, 60)[:, None], (60, episodes))
+    full = run_episodes(fake_evaluate(scores), np.arange(60), np.zeros((episodes, 2)))
+    evaluate = fake_evaluate(scores)
+    raced = run_episodes(evaluate, np.arange(60), np.zeros((episodes, 2)), num_top)
+    assert evaluate.episodes < 0.6 * 60 * episodes
+    check_same_top(full, raced, num_top)
+
+"""Agents that cannot reach the cutoff are stopped even when they are the best of the agents raced"""
+def test_cutoff():
+    scores = np.tile(np.arange(10.0)[:, None], (1, 4)) + np.array([0, 1, 0, -1])
+    evaluate = fake_evaluate(scores)
+    raced = run_episodes(evaluate, np.arange(10), np.zeros((4, 2)), 2, cutoff=20)
+    assert evaluate.episodes == 20 and not any(complete for distance, fitness, complete in raced)
+    assert all(fitness < 20 for distance, fitness, complete in raced)
+
+"""Random agents on the pogo, raced for the top 20% with the cutoff the top 20% kept from the last generation would give"""
+def test_pogo():
+    pogo = Pogo()
+    agents = [NeuralNetwork([12, 20, 20, 5], rng=agent_rng(7, 0, i)) for i in range(20)]
+    pushes = episode_pushes(7, 4, 20)
+    evaluate = lambda agents, agent_pushes, give_up: [run_episode(pogo, agent, push=push, give_up=agent_give_up)
+                                                      for agent, push, agent_give_up in zip(agents, agent_pushes, give_up)]
+    full = run_episodes(evaluate, agents, pushes)
+    cutoff = sorted(fitness for distance, fitness, complete in full)[-4]
+    raced = run_episodes(evaluate, agents, pushes, 4, cutoff)
+    assert not all(complete for distance, fitness, complete in raced)
+    check_same_top(full, raced, 4)
@@ -0,0 +1,26 @@
+# This file checks that the ways of evaluating a generation give the results of running every agent one after another. Run with
+# python -m pytest.
+#
+# Jacob Karty 12/3/2024
+
+from Pogo import Pogo
+from Evaluator import run_episode, episode_pushes, ParallelEvaluator
+from NeuralNet import NeuralNetwork
+from Trainer import agent_rng
+import numpy as np
+
+"""Worker processes give exactly the results of running the agents one after another, with pushes and with episodes given up, and
+again when the agents handed to them change"""
+def test_parallel():
+    population = [NeuralNetwork([12, 20, 20, 5], rng=agent_rng(9, 0, i)) for i in range(12)]
+    pushes = np.repeat(episode_pushes(9, 3, 100), 4, axis=0)
+    give_up = np.where(np.arange(12) % 3 == 0, 50, -np.inf)
+    pogo = Pogo()
+    serial = [run_episode(pogo, agent, push=push, give_up=agent_give_up) for agent, push, agent_give_up in zip(population, pushes, give_up)]
+    evaluator = ParallelEvaluator(2)
+    try:
+        assert evaluator.evaluate(population, pushes, give_up) == serial
+        assert evaluator.evaluate(population[::-1], pushes[::-1], give_up[::-1]) == serial[::-1]
+        assert evaluator.evaluate(population[:5]) == [run_episode(pogo, agent) for agent in population[:5]]
+    finally:
+        evaluator.close()
@@ -0,0 +1,41 @@
+# This file checks that a Population calculates every agent forward exactly like the agent on its own, and that saved neural nets load back
+# exactly. Run with python -m pytest.
+#
+# Jacob Karty 12/3/2024
+
+from NeuralNet import NeuralNetwork, Population, save_population, load_population
+from Trainer import agent_rng
+import numpy as np
+
+"""Returns random agents for the tests"""
+def agents(count, layers=(12, 20, 20, 5)):
+    return [NeuralNetwork(list(layers), rng=agent_rng(5, 0, i)) for i in range(count)]
+
+"""Population.calculate_forward gives every agent the response calculate_forward of the agent gives on its own"""
+def test_population_forward():
+    population = agents(30)
+    states = np.random.default_rng(0).normal(0, 100, (30, 12))
+    responses = Population(population).calculate_forward(states)
+    assert responses.shape == (30, 5)
+    for agent, state, response in zip(population, states, responses):
+        assert np.array_equal(agent.calculate_forward(state), response)
+
+"""A saved population loads back with the same genomes and metadata, whether it is memory mapped or copied"""
+def test_save_population(tmp_path):
+    population = agents(7, (12, 8, 5))
+    metadata = {'generation': 3, 'strategy': 'top_fifth', 'mutation_rate': 0.097, 'fitnesses': [1.5, None, -2.25, 0, 3, 4, 5]}
+    save_population(tmp_path / 'generation_3.pogo', population, **metadata)
+    for copy in (False, True):
+        loaded, loaded_metadata = load_population(tmp_path / 'generation_3.pogo', copy)
+        assert loaded_metadata == metadata
+        assert [agent.inputs for agent in loaded] == [[12, 8, 5]] * 7
+        assert np.array_equal([agent.genome for agent in loaded], [agent.genome for agent in population])
+
+"""A single saved agent loads back with the same responses"""
+def test_save_agent(tmp_path):
+    agent = agents(1)[0]
+    agent.save(tmp_path / 'best_agent.pogo', distance=512.5)
+    loaded = NeuralNetwork.load(tmp_path / 'best_agent.pogo', copy=True)
+    states = np.random.default_rng(1).normal(0, 100, (20, 12))
+    assert np.array_equal(loaded.genome, agent.genome)
+    assert all(np.array_equal(loaded.calculate_forward(state), agent.calculate_forward(state)) for state in states)
@@ -0,0 +1,66 @@
+# This file checks that resetting and restoring the pogo, which puts the bodies back into the same Pymunk space instead of building a new
+# one, moves the pogo bit for bit like a new one. Run with python -m pytest.
+#
+# Jacob Karty 12/3/2024
+
+from Pogo import Pogo, MultiPogo
+from Evaluator import run_episode, run_generation
+from NeuralNet import NeuralNetwork
+from Trainer import agent_rng
+import numpy as np
+
+class Recorder:
+    """Wraps an agent and keeps every observation it is given, so that whole episodes are compared and not just their results"""
+    def __init__(self, agent):
+        self.agent = agent
+        self.observations = []
+
+    """Keeps a copy of the observation and returns the response of the agent"""
+    def calculate_forward(self, value):
+        self.observations.append(np.array(value))
+        return self.agent.calculate_forward(value)
+
+"""Runs an episode of agent on pogo. Returns its distance and fitness, and every observation the agent was given"""
+def episode(pogo, agent, push=(0, 0)):
+    recorder = Recorder(agent)
+    return run_episode(pogo, recorder, push=push), np.array(recorder.observations)
+
+"""Returns random agents for the tests"""
+def agents(count):
+    return [NeuralNetwork([12, 20, 20, 5], rng=agent_rng(3, 0, i)) for i in range(count)]
+
+"""Every episode on a pogo that ran other episodes before is the same as on a new pogo"""
+def test_reset():
+    pogo = Pogo()
+    for i, agent in enumerate(agents(8)):
+        push = (40 * i - 150, 20 * i)
+        result, observations = episode(pogo, agent, push)
+        new_result, new_observations = episode(Pogo(), agent, push)
+        assert result == new_result
+        assert np.array_equal(observations, new_observations)
+
+"""Forks of a snapshot taken mid episode are the same as each other, whatever ran in between"""
+def test_restore():
+    first, second = agents(2)
+    pogo = Pogo()
+    for i in range(90):
+        pogo.apply_actions(first.calculate_forward(pogo.get_current_state()))
+        pogo.step()
+    snapshot = pogo.snapshot()
+    pogo.restore(snapshot) # continuing the run itself differs, as the contacts are not part of the snapshot (see restore)
+    result, observations = episode(pogo, second)
+    pogo.restore(snapshot)
+    for i in range(200):
+        pogo.apply_actions(first.calculate_forward(pogo.get_current_state()))
+        pogo.step()
+    pogo.restore(snapshot)
+    fork_result, fork_observations = episode(pogo, second)
+    assert result == fork_result
+    assert np.array_equal(observations, fork_observations)
+
+"""A MultiPogo that already ran a generation gives the results of running every agent on a new Pogo"""
+def test_multi_pogo():
+    population = agents(6)
+    pogo = MultiPogo(len(population))
+    run_generation(pogo, population[::-1])
+    assert run_generation(pogo, population) == [run_episode(Pogo(), agent) for agent in population]
@@ -0,0 +1,49 @@
+# This file checks that a run is repeated exactly by the same seed, and that a run that is saved and resumed continues exactly like one that
+# was never stopped. Run with python -m pytest.
+#
+# Jacob Karty 12/3/2024
+
+from Pogo import Pogo
+from Evaluator import run_episode
+from NeuralNet import NeuralNetwork
+from Trainer import Trainer, agent_rng
+import numpy as np
+
+"""Returns a new trainer of population_size agents for the run with the given seed, saved to run_dir"""
+def new_trainer(run_dir, seed, population_size=10):
+    population = [NeuralNetwork([12, 8, 5], rng=agent_rng(seed, 0, i)) for i in range(population_size)]
+    trainer = Trainer(population, str(run_dir), seed=seed)
+    trainer.save()
+    return trainer
+
+"""Evaluates generations generations of the trainer one agent after another, like main.py does headless"""
+def train(trainer, generations):
+    pogo = Pogo()
+    for i in range(generations):
+        results = [run_episode(pogo, agent) for agent in trainer.population]
+        trainer.next_generation([distance for distance, fitness in results], [fitness for distance, fitness in results])
+
+"""Returns everything about the trainer that has to be the same in two runs that are the same"""
+def state(trainer):
+    return (trainer.generation_number, np.array([agent.genome for agent in trainer.population]).tobytes(), trainer.fitnesses,
+            trainer.mutation_rate, trainer.strategy.get_state(), trainer.best_agent.genome.tobytes(), trainer.best_distance,
+            trainer.best_fitness, trainer.best_mutation_rate, trainer.episodes_run)
+
+"""Two runs with the same seed make bit for bit the same populations, and a different seed makes different ones"""
+def test_same_seed(tmp_path):
+    runs = [new_trainer(tmp_path / name, seed) for name, seed in (('a', 7), ('b', 7), ('c', 8))]
+    for trainer in runs:
+        train(trainer, 3)
+    assert state(runs[0]) == state(runs[1])
+    assert state(runs[0])[1] != state(runs[2])[1]
+
+"""A run that is loaded from its run directory and trained on ends exactly where a run that was never stopped does"""
+def test_resume(tmp_path):
+    straight = new_trainer(tmp_path / 'straight', 7)
+    train(straight, 4)
+    stopped = new_trainer(tmp_path / 'stopped', 7)
+    train(stopped, 2)
+    resumed = Trainer.load(str(tmp_path / 'stopped'))
+    assert state(resumed) == state(stopped)
+    train(resumed, 2)
+    assert state(resumed) == state(straight)
@@ -0,0 +1,146 @@
+# This file checks how closely NumpyPogo follows the Pymunk Pogo. First, random agents are run on the Pymunk Pogo and the actions they take
+# are replayed on NumpyPogo, which shows how far the pogos drift apart over an episode. The pogo is chaotic, so as a baseline the actions
+# are also replayed on a Pymunk Pogo that starts a millionth of a pixel to the right, which shows how far two pogos drift apart when the
+# physics is exactly the same. Then a random population is evaluated on both, which shows whether NumpyPogo ranks the agents the same way,
+# which is what matters for training. The same baseline is used there: the population is also evaluated on Pymunk pogos nudged a millionth
+# of a pixel, and NumpyPogo only passes if it ranks the agents at least as much like Pymunk as the nudged pogos do. The exit code is 1 if it
+# does not. Last, the time both take to step a pogo is measured.
+#
+# Jacob Karty 12/4/2024
+
+from Pogo import Pogo, MultiPogo
+from NumpyPogo import NumpyPogo
+from Evaluator import run_generation, episode_length
+from NeuralNet import NeuralNetwork
+from Trainer import agent_rng
+import numpy as np
+import sys
+import time
+
+# Validation parameters
+num_agents = 100
+hidden_layers = [20, 20, 20, 20, 20, 20]
+check_times = [0.1, 0.25, 0.5, 1, 2, 5, 10] # seconds into the episode the pogos are compared at
+seed = 0
+
+"""Runs each agent on the Pymunk Pogo for a whole episode, without stopping when it falls over. Returns the actions taken, as a
+(steps, agents, 5) array, and the states the pogo went through, as a (steps, agents, 12) array"""
+def record_episodes(agents, steps):
+    pogo = Pogo()
+    actions = np.zeros((steps, len(agents), 5))
+    states = np.zeros((steps, len(agents), 12))
+    for i, agent in enumerate(agents):
+        for t in range(steps):
+            actions[t, i] = agent.calculate_forward(pogo.get_current_state())
+            pogo.apply_actions(actions[t, i])
+            pogo.step()
+            states[t, i] = pogo.get_current_state()
+        pogo.reset_simulation()
+    return actions, states
+
+"""Replays the actions on a NumpyPogo with a pogo for each agent. Returns the states the pogos went through, as a (steps, agents, 12)
+array"""
+def replay_episodes(actions):
+    pogo = NumpyPogo(actions.shape[1])
+    states = np.zeros(actions.shape[:2] + (12,))
+    for t in range(len(actions)):
+        pogo.apply_actions(actions[t])
+        pogo.step()
+        states[t] = pogo.get_current_state()
+    return states
+
+"""Replays the actions on the Pymunk Pogo, with the pogo moved nudge pixels to the right at the start of each episode. Returns the states
+the pogo went through, as a (steps, agents, 12) array"""
+def replay_pymunk_episodes(actions, nudge):
+    pogo = Pogo()
+    states = np.zeros(actions.shape[:2] + (12,))
+    for i in range(actions.shape[1]):
+        pogo.pogo_body.position += (nudge, 0)
+        for t in range(len(actions)):
+            pogo.apply_actions(actions[t, i])
+            pogo.step()
+            states[t, i] = pogo.get_current_state()
+        pogo.reset_simulation()
+    return states
+
+"""Evaluates the agents at the same time on a MultiPogo whose pogos all start nudge pixels to the right. Returns the distances and the
+fitnesses, as arrays"""
+def evaluate_nudged(agents, nudge):
+    pogo = MultiPogo(len(agents))
+    for pogo_body in pogo.pogo_bodies:
+        pogo_body.position += (nudge, 0)
+    return np.array(run_generation(pogo, agents)).T
+
+"""Returns the rank of each value, 0 being the smallest"""
+def ranks(values):
+    return np.argsort(np.argsort(values))
+
+"""Returns the correlation of the ranks of two lists of fitnesses of the same agents, and how many of the top 20% agents of both are the
+same"""
+def agreement(fitnesses, other_fitnesses):
+    top = len(fitnesses) // 5
+    same_top = len(set(np.argsort(fitnesses)[-top:]) & set(np.argsort(other_fitnesses)[-top:]))
+    return np.corrcoef(ranks(fitnesses), ranks(other_fitnesses))[0, 1], same_top
+
+"""Returns the time in microseconds it takes to step a single pogo, when num_pogos pogos are stepped at the same time with random
+actions"""
+def time_per_step(pogo, num_pogos, steps=120):
+    actions = np.where(np.random.default_rng(seed).random((steps, num_pogos, 5)) >= 0.5, 1, -1)
+    start = time.perf_counter()
+    for t in range(steps):
+        pogo.get_current_state()
+        pogo.apply_actions(actions[t])
+        pogo.step()
+    return (time.perf_counter() - start) / steps / num_pogos * 1e6
+
+if __name__ == '__main__':
+    agents = [NeuralNetwork([12] + hidden_layers + [5], rng=agent_rng(seed, 0, i)) for i in range(num_agents)]
+    steps = int(round(episode_length / Pogo().time_step))
+
+    # Trajectories
+    print(f'Trajectories of {num_agents} random agents, with the actions taken on Pymunk replayed on NumpyPogo')
+    actions, reference = record_episodes(agents, steps)
+    replayed = replay_episodes(actions)
+    nudged = replay_pymunk_episodes(actions, 1e-6)
+    print(f'{"time (s)":>9} {"pogo position error (mean / max px)":>36} {"pogo angle error (mean / max rad)":>34} {"person position error (mean px)":>32}'
+          f' {"baseline pogo position error (mean px)":>39}')
+    for check_time in check_times:
+        t = min(int(round(check_time * steps / episode_length)), steps) - 1
+        pogo_error = np.linalg.norm(replayed[t, :, 2:4] - reference[t, :, 2:4], axis=1)
+        angle_error = np.abs(replayed[t, :, 0] - reference[t, :, 0])
+        person_error = np.linalg.norm(replayed[t, :, 8:10] - reference[t, :, 8:10], axis=1)
+        baseline_error = np.linalg.norm(nudged[t, :, 2:4] - reference[t, :, 2:4], axis=1)
+        print(f'{check_time:>9} {np.mean(pogo_error):>17.2f} / {np.max(pogo_error):<16.2f} {np.mean(angle_error):>16.3f} / {np.max(angle_error):<15.3f}'
+              f' {np.mean(person_error):>32.2f} {np.mean(baseline_error):>39.2f}')
+
+    # Fitness
+    print(f'\nA population of {num_agents} random agents evaluated on both')
+    results = []
+    for pogo in (MultiPogo(num_agents), NumpyPogo(num_agents)):
+        start = time.perf_counter()
+        distances, fitnesses = np.array(run_generation(pogo, agents)).T
+        results.append(fitnesses)
+        print(f'{type(pogo).__name__:>10}: mean distance {np.mean(distances):7.2f}, mean fitness {np.mean(fitnesses):7.2f}, '
+              f'best fitness {np.max(fitnesses):7.2f} ({time.perf_counter() - start:.2f} s)')
+    start = time.perf_counter()
+    distances, fitnesses = evaluate_nudged(agents, 1e-6)
+    print(f'{"nudged":>10}: mean distance {np.mean(distances):7.2f}, mean fitness {np.mean(fitnesses):7.2f}, '
+          f'best fitness {np.max(fitnesses):7.2f} ({time.perf_counter() - start:.2f} s)')
+    top = num_agents // 5
+    rank_correlation, same_top = agreement(results[0], results[1])
+    baseline_correlation, baseline_same_top = agreement(results[0], fitnesses)
+    print(f'NumpyPogo: correlation of the fitnesses {np.corrcoef(*results)[0, 1]:.3f}, of their ranks {rank_correlation:.3f}, '
+          f'{same_top} of the top {top} agents (the ones that reproduce) are the same')
+    print(f'Pymunk nudged a millionth of a pixel: correlation of the ranks {baseline_correlation:.3f}, {baseline_same_top} of the top {top} '
+          f'agents are the same')
+    passed = rank_correlation >= baseline_correlation and same_top >= baseline_same_top
+    print('NumpyPogo ranks the agents at least as much like Pymunk as the baseline does' if passed else
+          'NumpyPogo ranks the agents less like Pymunk than the baseline does, so it cannot stand in for Pymunk in training')
+
+    # Speed
+    print('\nMicroseconds to step a single pogo, including getting the state and applying the actions')
+    for num_pogos in (10, 100, 1000):
+        print(f'{num_pogos:>5} pogos: MultiPogo {time_per_step(MultiPogo(num_pogos), num_pogos):6.1f}, '
+              f'NumpyPogo {time_per_step(NumpyPogo(num_pogos), num_pogos):6.1f}')
+    if not passed:
+        sys.exit(1)